@@ -38,6 +38,27 @@ CREATE TABLE `column_information` (
 ) ENGINE=InnoDB AUTO_INCREMENT=0 DEFAULT CHARSET=latin1;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
+--
+-- Table structure for table `course_file_fingerprint`
+--
+
+DROP TABLE IF EXISTS `course_file_fingerprint`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!40101 SET character_set_client = utf8 */;
+CREATE TABLE `course_file_fingerprint` (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `course_file_id` int(11) DEFAULT NULL,
+  `etag` varchar(255) DEFAULT NULL,
+  `last_modified` varchar(100) DEFAULT NULL,
+  `file_size` bigint(20) DEFAULT NULL,
+  `content_hash` char(40) DEFAULT NULL,
+  `updated_datetime` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `course_file_information_course_file_fingerprint_id_idx` (`course_file_id`) USING BTREE,
+  CONSTRAINT `course_file_fingerprint_ibfk_1` FOREIGN KEY (`course_file_id`) REFERENCES `course_file_information` (`id`) ON DELETE NO ACTION ON UPDATE NO ACTION
+) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8 COMMENT='This table stores what was last loaded for each course file, so unchanged exports are not loaded again.';
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `course_file_information`
 --
@@ -57,6 +78,30 @@ CREATE TABLE `course_file_information` (
 ) ENGINE=InnoDB AUTO_INCREMENT=0 DEFAULT CHARSET=latin1;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
+--
+-- Table structure for table `course_file_stage_duration`
+--
+
+DROP TABLE IF EXISTS `course_file_stage_duration`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!40101 SET character_set_client = utf8 */;
+CREATE TABLE `course_file_stage_duration` (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `run_id` varchar(32) DEFAULT NULL,
+  `course_name_fl` varchar(100) DEFAULT NULL,
+  `version` smallint(6) DEFAULT NULL,
+  `file_name` varchar(255) DEFAULT NULL,
+  `stage` varchar(20) DEFAULT NULL,
+  `started_datetime` datetime DEFAULT NULL,
+  `duration_secs` double DEFAULT NULL,
+  `byte_count` bigint(20) DEFAULT NULL,
+  `row_count` bigint(20) DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  KEY `course_file_stage_duration_run_idx` (`run_id`) USING BTREE,
+  KEY `course_file_stage_duration_course_idx` (`course_name_fl`,`version`) USING BTREE
+) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8 COMMENT='This table stores how long each stage of a run (login, download, write, fixups, prepare, read_csv, to_datetime, to_sql, load_data, rscript) took for each course file, with the bytes and rows it handled.';
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `course_information`
 --
@@ -100,7 +145,8 @@ CREATE TABLE `course_information_details` (
   `week_datetime` text,
   `week_heading` text,
   `week_label` text,
-  KEY `ix_course_information_details_index` (`index`)
+  KEY `ix_course_information_details_index` (`index`),
+  KEY `course_information_details_course_idx` (`course_id`)
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -125,6 +171,44 @@ CREATE TABLE `course_logging_table` (
 ) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
+--
+-- Table structure for table `course_step_info_fingerprint`
+--
+
+DROP TABLE IF EXISTS `course_step_info_fingerprint`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!40101 SET character_set_client = utf8 */;
+CREATE TABLE `course_step_info_fingerprint` (
+  `course_id` int(11) NOT NULL,
+  `file_size` bigint(20) DEFAULT NULL,
+  `content_hash` char(40) DEFAULT NULL,
+  `updated_datetime` datetime DEFAULT NULL,
+  PRIMARY KEY (`course_id`),
+  CONSTRAINT `course_step_info_fingerprint_ibfk_1` FOREIGN KEY (`course_id`) REFERENCES `course_information` (`id`) ON DELETE NO ACTION ON UPDATE NO ACTION
+) ENGINE=InnoDB DEFAULT CHARSET=utf8 COMMENT='This table stores the size and content hash of the step info file last loaded into course_information_details for each course.';
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Table structure for table `course_vis_table_fingerprint`
+--
+
+DROP TABLE IF EXISTS `course_vis_table_fingerprint`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!40101 SET character_set_client = utf8 */;
+CREATE TABLE `course_vis_table_fingerprint` (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
+  `course_id` int(11) DEFAULT NULL,
+  `vis_table_id` int(11) DEFAULT NULL,
+  `source_fingerprint` char(40) DEFAULT NULL,
+  `built_datetime` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `course_vis_table_fingerprint_course_vis_table_idx` (`course_id`,`vis_table_id`) USING BTREE,
+  KEY `vis_table_information_course_vis_table_fingerprint_id_idx` (`vis_table_id`) USING BTREE,
+  CONSTRAINT `course_vis_table_fingerprint_ibfk_1` FOREIGN KEY (`course_id`) REFERENCES `course_information` (`id`) ON DELETE NO ACTION ON UPDATE NO ACTION,
+  CONSTRAINT `course_vis_table_fingerprint_ibfk_2` FOREIGN KEY (`vis_table_id`) REFERENCES `vis_table_information` (`id`) ON DELETE NO ACTION ON UPDATE NO ACTION
+) ENGINE=InnoDB AUTO_INCREMENT=1 DEFAULT CHARSET=utf8 COMMENT='This table stores the fingerprint of the source files each visualisation table of a course was last built from.';
+/*!40101 SET character_set_client = @saved_cs_client */;
+
 --
 -- Table structure for table `error_logging_table`
 --
@@ -534,6 +618,92 @@ DELIMITER ;
 /*!50003 SET character_set_client  = @saved_cs_client */ ;
 /*!50003 SET character_set_results = @saved_cs_results */ ;
 /*!50003 SET collation_connection  = @saved_col_connection */ ;
+/*!50003 DROP PROCEDURE IF EXISTS `get_course_file_fingerprints` */;
+/*!50003 SET @saved_cs_client      = @@character_set_client */ ;
+/*!50003 SET @saved_cs_results     = @@character_set_results */ ;
+/*!50003 SET @saved_col_connection = @@collation_connection */ ;
+/*!50003 SET character_set_client  = utf8 */ ;
+/*!50003 SET character_set_results = utf8 */ ;
+/*!50003 SET collation_connection  = utf8_general_ci */ ;
+/*!50003 SET @saved_sql_mode       = @@sql_mode */ ;
+/*!50003 SET sql_mode              = 'NO_ENGINE_SUBSTITUTION' */ ;
+DELIMITER ;;
+CREATE PROCEDURE `get_course_file_fingerprints`()
+BEGIN
+select 	ci.course_name_fl as course_name, ci.version, fi.file_name, cff.etag, cff.last_modified, cff.file_size, cff.content_hash
+from	futurelearn_courses_information.course_file_fingerprint cff
+inner join futurelearn_courses_information.course_file_information cfi on cfi.id = cff.course_file_id
+inner join futurelearn_courses_information.course_information ci on ci.id = cfi.course_id
+inner join futurelearn_courses_information.file_information fi on fi.id = cfi.file_id;
+END ;;
+DELIMITER ;
+/*!50003 SET sql_mode              = @saved_sql_mode */ ;
+/*!50003 SET character_set_client  = @saved_cs_client */ ;
+/*!50003 SET character_set_results = @saved_cs_results */ ;
+/*!50003 SET collation_connection  = @saved_col_connection */ ;
+/*!50003 DROP PROCEDURE IF EXISTS `get_course_ids` */;
+/*!50003 SET @saved_cs_client      = @@character_set_client */ ;
+/*!50003 SET @saved_cs_results     = @@character_set_results */ ;
+/*!50003 SET @saved_col_connection = @@collation_connection */ ;
+/*!50003 SET character_set_client  = utf8 */ ;
+/*!50003 SET character_set_results = utf8 */ ;
+/*!50003 SET collation_connection  = utf8_general_ci */ ;
+/*!50003 SET @saved_sql_mode       = @@sql_mode */ ;
+/*!50003 SET sql_mode              = 'NO_ENGINE_SUBSTITUTION' */ ;
+DELIMITER ;;
+CREATE PROCEDURE `get_course_ids`()
+BEGIN
+select 	ci.id, ci.course_name_fl as course_name, ci.version
+from	futurelearn_courses_information.course_information ci
+where 	ci.course_name_fl is not null;
+END ;;
+DELIMITER ;
+/*!50003 SET sql_mode              = @saved_sql_mode */ ;
+/*!50003 SET character_set_client  = @saved_cs_client */ ;
+/*!50003 SET character_set_results = @saved_cs_results */ ;
+/*!50003 SET collation_connection  = @saved_col_connection */ ;
+/*!50003 DROP PROCEDURE IF EXISTS `get_course_step_info_fingerprints` */;
+/*!50003 SET @saved_cs_client      = @@character_set_client */ ;
+/*!50003 SET @saved_cs_results     = @@character_set_results */ ;
+/*!50003 SET @saved_col_connection = @@collation_connection */ ;
+/*!50003 SET character_set_client  = utf8 */ ;
+/*!50003 SET character_set_results = utf8 */ ;
+/*!50003 SET collation_connection  = utf8_general_ci */ ;
+/*!50003 SET @saved_sql_mode       = @@sql_mode */ ;
+/*!50003 SET sql_mode              = 'NO_ENGINE_SUBSTITUTION' */ ;
+DELIMITER ;;
+CREATE PROCEDURE `get_course_step_info_fingerprints`()
+BEGIN
+select 	csf.course_id, csf.file_size, csf.content_hash
+from	futurelearn_courses_information.course_step_info_fingerprint csf;
+END ;;
+DELIMITER ;
+/*!50003 SET sql_mode              = @saved_sql_mode */ ;
+/*!50003 SET character_set_client  = @saved_cs_client */ ;
+/*!50003 SET character_set_results = @saved_cs_results */ ;
+/*!50003 SET collation_connection  = @saved_col_connection */ ;
+/*!50003 DROP PROCEDURE IF EXISTS `get_course_vis_table_fingerprints` */;
+/*!50003 SET @saved_cs_client      = @@character_set_client */ ;
+/*!50003 SET @saved_cs_results     = @@character_set_results */ ;
+/*!50003 SET @saved_col_connection = @@collation_connection */ ;
+/*!50003 SET character_set_client  = utf8 */ ;
+/*!50003 SET character_set_results = utf8 */ ;
+/*!50003 SET collation_connection  = utf8_general_ci */ ;
+/*!50003 SET @saved_sql_mode       = @@sql_mode */ ;
+/*!50003 SET sql_mode              = 'NO_ENGINE_SUBSTITUTION' */ ;
+DELIMITER ;;
+CREATE PROCEDURE `get_course_vis_table_fingerprints`()
+BEGIN
+select 	ci.course_name_fl as course_name, ci.version, vi.vis_table_name, cvf.source_fingerprint
+from	futurelearn_courses_information.course_vis_table_fingerprint cvf
+inner join futurelearn_courses_information.course_information ci on ci.id = cvf.course_id
+inner join futurelearn_courses_information.vis_table_information vi on vi.id = cvf.vis_table_id;
+END ;;
+DELIMITER ;
+/*!50003 SET sql_mode              = @saved_sql_mode */ ;
+/*!50003 SET character_set_client  = @saved_cs_client */ ;
+/*!50003 SET character_set_results = @saved_cs_results */ ;
+/*!50003 SET collation_connection  = @saved_col_connection */ ;
 /*!50003 DROP PROCEDURE IF EXISTS `get_duration_week_by_course` */;
 /*!50003 SET @saved_cs_client      = @@character_set_client */ ;
 /*!50003 SET @saved_cs_results     = @@character_set_results */ ;
@@ -603,6 +773,30 @@ DELIMITER ;
 /*!50003 SET character_set_client  = @saved_cs_client */ ;
 /*!50003 SET character_set_results = @saved_cs_results */ ;
 /*!50003 SET collation_connection  = @saved_col_connection */ ;
+/*!50003 DROP PROCEDURE IF EXISTS `get_finished_course_runs` */;
+/*!50003 SET @saved_cs_client      = @@character_set_client */ ;
+/*!50003 SET @saved_cs_results     = @@character_set_results */ ;
+/*!50003 SET @saved_col_connection = @@collation_connection */ ;
+/*!50003 SET character_set_client  = utf8 */ ;
+/*!50003 SET character_set_results = utf8 */ ;
+/*!50003 SET collation_connection  = utf8_general_ci */ ;
+/*!50003 SET @saved_sql_mode       = @@sql_mode */ ;
+/*!50003 SET sql_mode              = 'NO_ENGINE_SUBSTITUTION' */ ;
+DELIMITER ;;
+CREATE PROCEDURE `get_finished_course_runs`()
+BEGIN
+select 	ci.course_name_fl as course_name, ci.version, ci.duration_week, fi.file_name
+from	futurelearn_courses_information.course_information ci
+left join futurelearn_courses_information.course_file_information cfi on cfi.course_id = ci.id
+left join futurelearn_courses_information.file_information fi on fi.id = cfi.file_id
+where ci.status = 'FINISHED' and ci.course_name_fl is not null
+order by ci.course_name_fl, ci.version, fi.id;
+END ;;
+DELIMITER ;
+/*!50003 SET sql_mode              = @saved_sql_mode */ ;
+/*!50003 SET character_set_client  = @saved_cs_client */ ;
+/*!50003 SET character_set_results = @saved_cs_results */ ;
+/*!50003 SET collation_connection  = @saved_col_connection */ ;
 /*!50003 DROP PROCEDURE IF EXISTS `get_finished_courses` */;
 /*!50003 SET @saved_cs_client      = @@character_set_client */ ;
 /*!50003 SET @saved_cs_results     = @@character_set_results */ ;
@@ -915,6 +1109,241 @@ BEGIN
  );
  
  
+ END ;;
+DELIMITER ;
+/*!50003 SET sql_mode              = @saved_sql_mode */ ;
+/*!50003 SET character_set_client  = @saved_cs_client */ ;
+/*!50003 SET character_set_results = @saved_cs_results */ ;
+/*!50003 SET collation_connection  = @saved_col_connection */ ;
+/*!50003 DROP PROCEDURE IF EXISTS `merge_course_file_information_staging` */;
+/*!50003 SET @saved_cs_client      = @@character_set_client */ ;
+/*!50003 SET @saved_cs_results     = @@character_set_results */ ;
+/*!50003 SET @saved_col_connection = @@collation_connection */ ;
+/*!50003 SET character_set_client  = utf8 */ ;
+/*!50003 SET character_set_results = utf8 */ ;
+/*!50003 SET collation_connection  = utf8_general_ci */ ;
+/*!50003 SET @saved_sql_mode       = @@sql_mode */ ;
+/*!50003 SET sql_mode              = 'NO_ENGINE_SUBSTITUTION' */ ;
+DELIMITER ;;
+CREATE PROCEDURE `merge_course_file_information_staging`()
+BEGIN
+
+-- The rows of the course_file_information_staging temporary table, created by the caller in its session,
+-- that are not in course_file_information yet are inserted in one statement.
+INSERT INTO `futurelearn_courses_information`.`course_file_information` (`course_id`,`file_id`)
+select	distinct s.course_id, s.file_id
+from	course_file_information_staging s
+where	s.course_id is not null and s.file_id is not null
+and		not exists (select 1
+					from	`futurelearn_courses_information`.`course_file_information` cfi
+					where	cfi.course_id = s.course_id and cfi.file_id = s.file_id);
+
+END ;;
+DELIMITER ;
+/*!50003 SET sql_mode              = @saved_sql_mode */ ;
+/*!50003 SET character_set_client  = @saved_cs_client */ ;
+/*!50003 SET character_set_results = @saved_cs_results */ ;
+/*!50003 SET collation_connection  = @saved_col_connection */ ;
+/*!50003 DROP PROCEDURE IF EXISTS `merge_course_information_staging` */;
+/*!50003 SET @saved_cs_client      = @@character_set_client */ ;
+/*!50003 SET @saved_cs_results     = @@character_set_results */ ;
+/*!50003 SET @saved_col_connection = @@collation_connection */ ;
+/*!50003 SET character_set_client  = utf8 */ ;
+/*!50003 SET character_set_results = utf8 */ ;
+/*!50003 SET collation_connection  = utf8_general_ci */ ;
+/*!50003 SET @saved_sql_mode       = @@sql_mode */ ;
+/*!50003 SET sql_mode              = 'NO_ENGINE_SUBSTITUTION' */ ;
+DELIMITER ;;
+CREATE PROCEDURE `merge_course_information_staging`()
+BEGIN
+
+-- The courses of the course_information_staging temporary table, created by the caller in its session,
+-- are updated if they exist and inserted otherwise, as update_course_information does for one course.
+UPDATE `futurelearn_courses_information`.`course_information` ci
+join	course_information_staging s
+on		ci.course_name_fl = s.course_name_fl and ci.version = s.version
+SET
+	ci.`course_name` = s.course_name,
+	ci.`duration_week` = s.duration_week,
+	ci.`end_date` = s.end_date,
+	ci.`start_date` = s.start_date,
+	ci.`active` = s.active,
+	ci.`status` = s.status,
+	ci.`organisation` = s.organisation;
+
+INSERT INTO `futurelearn_courses_information`.`course_information`
+(`course_name`, `course_name_fl`, `duration_week`, `end_date`, `start_date`, `version`, `active`, `status`, `organisation`)
+select	s.course_name, s.course_name_fl, s.duration_week, s.end_date, s.start_date, s.version, s.active, s.status, s.organisation
+from	course_information_staging s
+where	s.course_name_fl is not null and s.version is not null
+and		not exists (select 1
+					from	`futurelearn_courses_information`.`course_information` ci
+					where	ci.course_name_fl = s.course_name_fl and ci.version = s.version)
+group by s.course_name_fl, s.version;
+
+END ;;
+DELIMITER ;
+/*!50003 SET sql_mode              = @saved_sql_mode */ ;
+/*!50003 SET character_set_client  = @saved_cs_client */ ;
+/*!50003 SET character_set_results = @saved_cs_results */ ;
+/*!50003 SET collation_connection  = @saved_col_connection */ ;
+/*!50003 DROP PROCEDURE IF EXISTS `merge_course_logging_staging` */;
+/*!50003 SET @saved_cs_client      = @@character_set_client */ ;
+/*!50003 SET @saved_cs_results     = @@character_set_results */ ;
+/*!50003 SET @saved_col_connection = @@collation_connection */ ;
+/*!50003 SET character_set_client  = utf8 */ ;
+/*!50003 SET character_set_results = utf8 */ ;
+/*!50003 SET collation_connection  = utf8_general_ci */ ;
+/*!50003 SET @saved_sql_mode       = @@sql_mode */ ;
+/*!50003 SET sql_mode              = 'NO_ENGINE_SUBSTITUTION' */ ;
+DELIMITER ;;
+CREATE PROCEDURE `merge_course_logging_staging`()
+BEGIN
+
+-- The messages of the course_logging_staging temporary table, created by the caller in its session,
+-- are inserted in one statement, with the ids looked up as insert_course_logging_table does for one message.
+INSERT INTO `futurelearn_courses_information`.`course_logging_table`
+(`course_file_id`, `vis_table_id`, `log_datetime`, `comment`)
+select	case when s.file_name = '' or length(s.file_name) < 4 then 0 else cfi.id end,
+		case when s.vis_table_name = '' or length(s.vis_table_name) < 4 then 0 else vi.id end,
+		s.log_datetime, s.comments
+from	course_logging_staging s
+join	`futurelearn_courses_information`.`course_information` ci
+on		ci.course_name_fl = s.course_name and ci.version = s.version
+left join `futurelearn_courses_information`.`file_information` fi
+on		fi.file_name = s.file_name
+left join `futurelearn_courses_information`.`course_file_information` cfi
+on		cfi.course_id = ci.id and cfi.file_id = fi.id
+left join `futurelearn_courses_information`.`vis_table_information` vi
+on		vi.vis_table_name = s.vis_table_name
+order by s.id;
+
+END ;;
+DELIMITER ;
+/*!50003 SET sql_mode              = @saved_sql_mode */ ;
+/*!50003 SET character_set_client  = @saved_cs_client */ ;
+/*!50003 SET character_set_results = @saved_cs_results */ ;
+/*!50003 SET collation_connection  = @saved_col_connection */ ;
+/*!50003 DROP PROCEDURE IF EXISTS `update_course_file_fingerprint` */;
+/*!50003 SET @saved_cs_client      = @@character_set_client */ ;
+/*!50003 SET @saved_cs_results     = @@character_set_results */ ;
+/*!50003 SET @saved_col_connection = @@collation_connection */ ;
+/*!50003 SET character_set_client  = utf8 */ ;
+/*!50003 SET character_set_results = utf8 */ ;
+/*!50003 SET collation_connection  = utf8_general_ci */ ;
+/*!50003 SET @saved_sql_mode       = @@sql_mode */ ;
+/*!50003 SET sql_mode              = 'NO_ENGINE_SUBSTITUTION' */ ;
+DELIMITER ;;
+CREATE PROCEDURE `update_course_file_fingerprint`(
+  course_name varchar(100),
+  version int,
+  file_name varchar(255),
+  etag varchar(255),
+  last_modified varchar(100),
+  file_size bigint,
+  content_hash char(40)
+ )
+BEGIN
+
+ set @course_id  = (select  id
+ from	`futurelearn_courses_information`.`course_information` ci
+ where	ci.course_name_fl = course_name and ci.version = version);
+
+ set @file_id  = (select  id
+ from	`futurelearn_courses_information`.`file_information` fi
+ where	fi.file_name = file_name);
+
+ set @course_file_id  = (select  id
+ from	`futurelearn_courses_information`.`course_file_information` cfi
+ where	cfi.course_id = @course_id and cfi.file_id = @file_id);
+
+ if (@course_file_id > 0) then
+ INSERT INTO `futurelearn_courses_information`.`course_file_fingerprint`
+ (`course_file_id`, `etag`, `last_modified`, `file_size`, `content_hash`, `updated_datetime`)
+ VALUES
+ (@course_file_id, etag, last_modified, file_size, content_hash, now())
+ ON DUPLICATE KEY UPDATE
+ `etag` = VALUES(`etag`),
+ `last_modified` = VALUES(`last_modified`),
+ `file_size` = VALUES(`file_size`),
+ `content_hash` = VALUES(`content_hash`),
+ `updated_datetime` = VALUES(`updated_datetime`);
+ end if;
+
+ END ;;
+DELIMITER ;
+/*!50003 SET sql_mode              = @saved_sql_mode */ ;
+/*!50003 SET character_set_client  = @saved_cs_client */ ;
+/*!50003 SET character_set_results = @saved_cs_results */ ;
+/*!50003 SET collation_connection  = @saved_col_connection */ ;
+/*!50003 DROP PROCEDURE IF EXISTS `update_course_step_info_fingerprint` */;
+/*!50003 SET @saved_cs_client      = @@character_set_client */ ;
+/*!50003 SET @saved_cs_results     = @@character_set_results */ ;
+/*!50003 SET @saved_col_connection = @@collation_connection */ ;
+/*!50003 SET character_set_client  = utf8 */ ;
+/*!50003 SET character_set_results = utf8 */ ;
+/*!50003 SET collation_connection  = utf8_general_ci */ ;
+/*!50003 SET @saved_sql_mode       = @@sql_mode */ ;
+/*!50003 SET sql_mode              = 'NO_ENGINE_SUBSTITUTION' */ ;
+DELIMITER ;;
+CREATE PROCEDURE `update_course_step_info_fingerprint`(
+  course_id int,
+  file_size bigint,
+  content_hash char(40)
+ )
+BEGIN
+
+ INSERT INTO `futurelearn_courses_information`.`course_step_info_fingerprint`
+ (`course_id`, `file_size`, `content_hash`, `updated_datetime`)
+ VALUES
+ (course_id, file_size, content_hash, now())
+ ON DUPLICATE KEY UPDATE
+ `file_size` = VALUES(`file_size`),
+ `content_hash` = VALUES(`content_hash`),
+ `updated_datetime` = VALUES(`updated_datetime`);
+
+ END ;;
+DELIMITER ;
+/*!50003 SET sql_mode              = @saved_sql_mode */ ;
+/*!50003 SET character_set_client  = @saved_cs_client */ ;
+/*!50003 SET character_set_results = @saved_cs_results */ ;
+/*!50003 SET collation_connection  = @saved_col_connection */ ;
+/*!50003 DROP PROCEDURE IF EXISTS `update_course_vis_table_fingerprint` */;
+/*!50003 SET @saved_cs_client      = @@character_set_client */ ;
+/*!50003 SET @saved_cs_results     = @@character_set_results */ ;
+/*!50003 SET @saved_col_connection = @@collation_connection */ ;
+/*!50003 SET character_set_client  = utf8 */ ;
+/*!50003 SET character_set_results = utf8 */ ;
+/*!50003 SET collation_connection  = utf8_general_ci */ ;
+/*!50003 SET @saved_sql_mode       = @@sql_mode */ ;
+/*!50003 SET sql_mode              = 'NO_ENGINE_SUBSTITUTION' */ ;
+DELIMITER ;;
+CREATE PROCEDURE `update_course_vis_table_fingerprint`(
+  course_name varchar(100),
+  version int,
+  vis_table_name varchar(100),
+  source_fingerprint char(40)
+ )
+BEGIN
+
+ set @course_id  = (select  id
+ from	`futurelearn_courses_information`.`course_information` ci
+ where	ci.course_name_fl = course_name and ci.version = version);
+
+ set @vis_table_id  = (select  id
+ from	`futurelearn_courses_information`.`vis_table_information` vi
+ where	vi.vis_table_name = vis_table_name);
+
+ if (@course_id > 0 and @vis_table_id > 0) then
+ INSERT INTO `futurelearn_courses_information`.`course_vis_table_fingerprint`
+ (`course_id`, `vis_table_id`, `source_fingerprint`, `built_datetime`)
+ VALUES
+ (@course_id, @vis_table_id, source_fingerprint, now())
+ ON DUPLICATE KEY UPDATE
+ `source_fingerprint` = VALUES(`source_fingerprint`),
+ `built_datetime` = VALUES(`built_datetime`);
+ end if;
+
  END ;;
 DELIMITER ;
 /*!50003 SET sql_mode              = @saved_sql_mode */ ;
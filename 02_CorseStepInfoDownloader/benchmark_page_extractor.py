@@ -0,0 +1,135 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist  and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+# ---------------------------------------------------------------------------------
+#
+# Micro-benchmark of page_extractor on saved week and step pages: the pages of the page cache folder
+# (or of [benchmark] extractor_fixture_folder, another page cache folder), or synthetic pages if there are none.
+# Each page is extracted [benchmark] extractor_iterations times with the compiled XPath expressions of page_extractor,
+# and with the same expressions given as strings to tree.xpath, and the pages per second are logged.
+#
+# ---------------------------------------------------------------------------------
+import ConfigParser
+import json
+import logging
+import os
+import re
+import time
+from lxml import etree
+from lxml import html
+from page_extractor import extract_week, extract_step_content
+
+
+def read_fixtures(folder):
+    """
+        Read the week and step pages of a page cache folder.
+    :return: The list of week pages and the list of step pages.
+    """
+    week_pages = []
+    step_pages = []
+    index_path = os.path.join(folder, 'index.json')
+    if not os.path.isfile(index_path):
+        return week_pages, step_pages
+    with open(index_path, 'rb') as f:
+        entries = json.load(f)
+    for url, entry in sorted(entries.items()):
+        body_path = os.path.join(folder, entry['hash'] + '.html')
+        if not os.path.isfile(body_path):
+            continue
+        if re.search(r"/todo/[0-9]+$", url):
+            week_pages.append(open(body_path, 'rb').read())
+        elif re.search(r"/steps/[0-9]+$", url):
+            step_pages.append(open(body_path, 'rb').read())
+    return week_pages, step_pages
+
+
+def synthetic_fixtures(week_count=6, steps_per_week=20):
+    """
+        Build week and step pages with the structure the XPath expressions of page_extractor expect.
+    """
+    week_pages = []
+    for week in range(1, week_count + 1):
+        steps = "".join('<li><a href="/courses/benchmark/1/steps/{0}{1}"><span><div>{0}.{1}</div></span>'
+                        '<span class="m-composite-link__primary"> Step {0}.{1} </span>'
+                        '<span class="m-composite-link__secondary type"> video (01:28) </span></a></li>'.format(week, step)
+                        for step in range(1, steps_per_week + 1))
+        week_pages.append('<html><body><h1 class="u-hidden-small">Week {0}: Heading</h1><div id="main-content"><section>'
+                          '<div><div><ol><li><ol>{1}</ol></li></ol></div></div></section></div></body></html>'.format(week, steps))
+    content = "".join("<p>Paragraph {0} of the step, with <a href='#'>a link</a>.</p>".format(i) for i in range(30))
+    step_pages = ['<html><body><div id="main-content"><article><section><div><div></div><div><div><div></div>'
+                  '<div>{0}</div></div></div></div></section></article></div></body></html>'.format(content)] * (week_count * steps_per_week)
+    return week_pages, step_pages
+
+
+def extract_week_with_strings(html_content):
+    # The extraction as getStepInformation did it, with the XPath expressions compiled at every call.
+    tree = html.fromstring(html_content)
+    week_heading = tree.xpath("""//*[@class="u-hidden-small"]/text()""")
+    week_number = int(week_heading[0].split(":")[0][5:].strip())
+    return (week_heading, week_number,
+            tree.xpath("""//*[@id="main-content"]/section/div/div/ol/li/ol/li/a/span/div/text()"""),
+            tree.xpath("""//*[@id="main-content"]/section/div/div/ol/li/ol/li/a/@href"""),
+            [title.strip() for title in tree.xpath("""//*[@class="m-composite-link__primary"]/text()""")],
+            [asset_type.strip() for asset_type in tree.xpath("""//*[@class="m-composite-link__secondary type"]/text()""")])
+
+
+def extract_step_content_with_strings(html_content):
+    tree = html.fromstring(html_content)
+    elem = tree.xpath("""//*[@id="main-content"]/article/section/div/div[2]/div/div[2]""")
+    return map(etree.tostring, elem)
+
+
+def measure(name, extract, pages, iterations):
+    start_time = time.time()
+    for i in range(iterations):
+        for page in pages:
+            extract(page)
+    seconds = time.time() - start_time
+    logger.info("{0}: {1} pages in {2:.2f} seconds ({3:.0f} pages/s)".format(
+        name, len(pages) * iterations, seconds, len(pages) * iterations / seconds))
+
+
+logger = logging.getLogger('futurelearn_page_extractor_benchmark')
+logging.basicConfig(format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %I:%M:%S %p')
+logger.setLevel(logging.INFO)
+
+config = ConfigParser.ConfigParser(allow_no_value=True)
+config.read('config.txt')
+iterations = config.getint("benchmark", "extractor_iterations")
+fixture_folder = config.get("benchmark", "extractor_fixture_folder")
+if len(fixture_folder.strip()) == 0:
+    fixture_folder = config.get("page_cache", "folder")
+if len(fixture_folder.strip()) == 0:
+    output_path = config.get("general", "place_files_in_data_directory").strip() or os.getcwd()
+    fixture_folder = os.path.join(output_path, 'page_cache')
+
+week_pages, step_pages = read_fixtures(fixture_folder)
+if not week_pages or not step_pages:
+    logger.info("No week or step pages in {0}, using synthetic pages.".format(fixture_folder))
+    week_pages, step_pages = synthetic_fixtures()
+logger.info("{0} week pages and {1} step pages, {2} iterations".format(len(week_pages), len(step_pages), iterations))
+
+measure("week pages, compiled XPath", extract_week, week_pages, iterations)
+measure("week pages, string XPath", extract_week_with_strings, week_pages, iterations)
+measure("step pages, compiled XPath", extract_step_content, step_pages, iterations)
+measure("step pages, string XPath", extract_step_content_with_strings, step_pages, iterations)
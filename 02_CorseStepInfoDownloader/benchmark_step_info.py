@@ -0,0 +1,89 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist  and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+# ---------------------------------------------------------------------------------
+#
+# Benchmark of readStepInfoFiles, which reads the step info files loaded by loadStepInfoToDatabase.
+# Synthetic <course_slug>-<version>-step_info.csv files are written for the largest number of courses of
+# [benchmark] step_info_courses, and the files of the first N courses are read for each N. The time per course
+# should stay the same as N grows (appending the files one at a time made it grow with N).
+#
+# ---------------------------------------------------------------------------------
+import ConfigParser
+import csv
+import logging
+import os
+import shutil
+import tempfile
+import time
+from importAllStepInformation import readStepInfoFiles
+
+COLUMNS = ['step_number', 'title', 'type', 'duration', 'duration_secs', 'week_label', 'week_datetime', 'week_date',
+           'week_heading', 'step_url', 'step_content']
+
+
+def write_step_info_file(filepath, course_slug, step_count):
+    """
+        Write a step info file of step_count steps, 20 steps a week, in the format written by getStepInformation.
+    """
+    with open(filepath, 'wb') as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerow(COLUMNS)
+        for i in range(step_count):
+            week = i / 20 + 1
+            writer.writerow(["{0}.{1}".format(week, i % 20 + 1), "Step {0} title".format(i + 1), 'Video', '05:00', 300.0,
+                             "Week {0}".format(week), "2017-01-{0:02d}".format(week * 7), "{0} Jan".format(week * 7),
+                             "Week {0}: Heading".format(week), "https://www.futurelearn.com/courses/{0}/1/steps/{1}".format(course_slug, i),
+                             "['<div><p>Content of step {0}, with some text to make it the size of a real step.</p></div>']".format(i)])
+
+
+logger = logging.getLogger('futurelearn_step_info_benchmark')
+logging.basicConfig(format='%(asctime)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %I:%M:%S %p')
+logger.setLevel(logging.INFO)
+
+config = ConfigParser.ConfigParser(allow_no_value=True)
+config.read('config.txt')
+course_counts = sorted(int(x) for x in config.get("benchmark", "step_info_courses").split(",") if x.strip())
+steps_per_course = config.getint("benchmark", "steps_per_course")
+
+folder = tempfile.mkdtemp(prefix='step_info_benchmark')
+try:
+    course_slugs = ["benchmark-course-{0:05d}".format(i) for i in range(course_counts[-1])]
+    for course_slug in course_slugs:
+        write_step_info_file(os.path.join(folder, "{0}-1-step_info.csv".format(course_slug)), course_slug, steps_per_course)
+
+    for course_count in course_counts:
+        # Only the files of the first course_count courses are in the folder read.
+        run_folder = os.path.join(folder, str(course_count))
+        os.makedirs(run_folder)
+        for course_slug in course_slugs[:course_count]:
+            filename = "{0}-1-step_info.csv".format(course_slug)
+            shutil.copy(os.path.join(folder, filename), os.path.join(run_folder, filename))
+
+        start_time = time.time()
+        df = readStepInfoFiles(run_folder, lambda course_name, version: -1)
+        seconds = time.time() - start_time
+        logger.info("{0} courses ({1} steps): {2:.2f} seconds, {3:.1f} ms per course".format(
+            course_count, len(df.index), seconds, seconds * 1000 / course_count))
+finally:
+    shutil.rmtree(folder)
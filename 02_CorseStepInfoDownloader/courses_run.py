@@ -26,22 +26,37 @@
 import datetime
 from bs4 import BeautifulSoup
 
+MAINSITE = 'https://www.futurelearn.com'
+
+def getAdminUrl(organisation):
+	""" The url of the course admin page of an organisation
+
+	:param organisation: The organisation slug.
+	:return:
+	"""
+	return MAINSITE + '/admin/organisations/{0}/courses'.format(organisation)
+
 class FLCourses:
 
-	def __init__(self,login,organisation,logger):
+	def __init__(self,fetcher,organisation,logger,known_runs=None,admin_response=None):
 		"""Check we have Facilitator level privileges
 
 			:param:
-			    login: The BeautifulSoup Session
+			    fetcher: The PageFetcher of the logged in session (see page_fetcher.py)
+			    known_runs: The metadata of the finished runs in the database (see DBConnection.getFinishedCourseRuns),
+			                their run and stats pages are not fetched again
+			    admin_response: The response of the course admin page (see getAdminUrl), fetched here if None
 		"""
-		self.__session  =  login
-		self.__mainsite = 'https://www.futurelearn.com'
+		self.__session  =  fetcher
+		self.__mainsite = MAINSITE
 		self.__isAdmin = False
 		self.__uni = ''
 		self.__logger = logger
 		self.__organisation = organisation
-		admin_url = self.__mainsite + '/admin/organisations/{0}/courses'.format(organisation)
-		self.__rep = self.__session.get(admin_url, allow_redirects=True)
+		self.__known_runs = known_runs or {}
+		if admin_response is None:
+			admin_response = self.__session.get(getAdminUrl(organisation))
+		self.__rep = admin_response
 
 		if(self.__rep.status_code == 200):
 			self.__isAdmin = True
@@ -51,17 +66,44 @@ class FLCourses:
 
 	def getCourses(self):
 		"""	Scrape the course metadata
+			The run and stats pages of all the runs are fetched at the same time by the workers of the fetcher,
+			except for the finished runs that are already known.
 
 			:return
 			    courses (Dictionary) : A dictionary keyed on course name, values are themselves dictionaries of course metadata
 			"""
 
+		if(self.__isAdmin):
+			courses, runs_to_fetch = self.findCourses()
+			# The responses are in the order of the urls.
+			urls = [run[2] for run in runs_to_fetch] + [run[3] for run in runs_to_fetch]
+			responses = self.__session.get_all(urls)
+			for i, run in enumerate(runs_to_fetch):
+				self.setRunPages(run, responses[i], responses[len(runs_to_fetch) + i])
+			return courses
+
+		else:
+			return None
+
+	def findCourses(self):
+		"""	Find the courses and runs of the admin page, without fetching the pages of the runs
+			The metadata of the finished runs that are already known is filled in, the caller fetches the
+			run details and stats pages of the other runs and passes them to setRunPages.
+
+			:return
+			    (courses, runs_to_fetch): the dictionary of getCourses and the list of
+			    (run_data, start date, run details url, stats url) of the runs whose pages have to be fetched.
+			    Both are empty without Facilitator level privileges.
+			"""
+
+		courses = {}
+		runs_to_fetch = []
 		if(self.__isAdmin):
 			webpage = self.__rep.content
 			soup = BeautifulSoup(webpage,'html.parser')
 			# get all courses info
 			tables = soup.findAll("table",{'class': 'm-table m-table--highlightable m-table--manage-courses m-table--bookended'})
-			courses = {}
+			known_run_count = 0
 
 			for table in tables:
 				for course in table.find_all('tbody'):
@@ -85,37 +127,69 @@ class FLCourses:
 							# Fetch data of finished courses only
 							if( _status == 'finished' or _status == 'in progress' or _status == 'upcoming'):
 
-								run_duration_weeks = self.getRunDuration(self.__mainsite + _run_details_path)
-
-								# Convert to Date type and compute end date
+								# Convert to Date type, the end date is computed once the duration is known
 								# Pad if needed. e.g. 9 May 2016 to 09 May 2016
 								if(len(_start_date) == 10):
 									_start_date = "0"+_start_date
 
 								start_date = datetime.datetime.strptime(_start_date, "%d %b %Y")
-								end_date = start_date + datetime.timedelta(weeks=int(run_duration_weeks))
 
-								#print "...end date: %s" %end_date
-
-								run_data = { 'course_name_fl' : course_name_fl, 'duration_week' : run_duration_weeks
+								run_data = { 'course_name_fl' : course_name_fl, 'duration_week' : 0
 									, 'start_date': start_date.strftime('%Y-%m-%d')
-									, 'end_date': end_date.strftime('%Y-%m-%d')
+									, 'end_date': None
 									, 'status' : _status.upper(), 'version' : run_count, 'active' : 1
-									, 'datasets' : self.getDatasets(self.__mainsite + _stats_path)
+									, 'datasets' : None
 									, 'organisation': self.__organisation
 									}
+
+								# The duration and the datasets of a finished run do not change any more.
+								known_run = self.__known_runs.get((course_name_fl, str(run_count)))
+								if(_status == 'finished' and known_run is not None and len(known_run['datasets']) > 0):
+									self.setRunDuration(run_data, start_date, known_run['duration_week'])
+									run_data['datasets'] = list(known_run['datasets'])
+									known_run_count += 1
+								else:
+									runs_to_fetch.append((run_data, start_date, self.__mainsite + _run_details_path, self.__mainsite + _stats_path))
 								course_info[str(run_count)] = run_data
 
 							run_count-=1
 
 						courses[course_name] = course_info
 					except Exception, e:
-						self.__logger.erro("Some problem!")
-		
-			return courses
-		
-		else:
-			return None
+						self.__logger.error("Some problem!")
+
+			self.__logger.info("{0}: {1} runs to fetch, {2} finished runs were already known.".format(self.__organisation, len(runs_to_fetch), known_run_count))
+
+		return courses, runs_to_fetch
+
+	def setRunPages(self, run, run_details_response, stats_response):
+		""" Set the duration, end date and datasets of a run from its pages
+
+		:param run: The (run_data, start date, run details url, stats url) of findCourses.
+		:param run_details_response: The response of the run details url.
+		:param stats_response: The response of the stats dashboard url.
+		:return:
+		"""
+		run_data, start_date, run_details_url, stats_url = run
+		try:
+			self.setRunDuration(run_data, start_date, self.parseRunDuration(run_details_response))
+			run_data['datasets'] = self.parseDatasets(stats_response)
+		except Exception, e:
+			# The run has no datasets, so it is left out of the csv files.
+			self.__logger.error("Could not parse the pages of the run: %s" %run_details_url)
+			run_data['datasets'] = []
+
+	def setRunDuration(self, run_data, start_date, run_duration_weeks):
+		""" Set the duration and the end date of a run
+
+		:param run_data: The metadata of the run.
+		:param start_date: The start date of the run, as a datetime.
+		:param run_duration_weeks: The duration of the run, in weeks.
+		:return:
+		"""
+		end_date = start_date + datetime.timedelta(weeks=int(run_duration_weeks))
+		run_data['duration_week'] = run_duration_weeks
+		run_data['end_date'] = end_date.strftime('%Y-%m-%d')
 
 	def getDatasets(self, stats_dashboard_url):
 		""" Assemble URL to datasets (CSV files)
@@ -123,24 +197,32 @@ class FLCourses:
 		:param stats_dashboard_url:
 		:return:
 		"""
+		if(self.__isAdmin):
+			return self.parseDatasets(self.__session.get(stats_dashboard_url))
+
+	def parseDatasets(self, response):
+		""" Find the datasets (CSV files) of the stats dashboard page
+
+		:param response: The response of the stats dashboard url.
+		:return: The list of file names.
+		"""
 
 		#data = {}
 		filenames = []
-		
-		if(self.__isAdmin):
-			soup = BeautifulSoup(self.__session.get(stats_dashboard_url).content, 'html.parser')
-			# FutureLearn removed the class name of the ul tag
-			datasets = soup.find('ul',attrs={'class': None})
 
-			if(datasets):	
-				links = datasets.find_all('li')
+		soup = BeautifulSoup(response.content, 'html.parser')
+		# FutureLearn removed the class name of the ul tag
+		datasets = soup.find('ul',attrs={'class': None})
+
+		if(datasets):	
+			links = datasets.find_all('li')
 
-				for li in links:
-					link = li.find('a')['href']
-					split = str.split(str(link),'/')
-					filename = split[7]
-					filenames.append(filename)
-			return filenames
+			for li in links:
+				link = li.find('a')['href']
+				split = str.split(str(link),'/')
+				filename = split[7]
+				filenames.append(filename)
+		return filenames
 
 	def getRunDuration(self, _run_details_url):
 		""" Find the duration of the course, in weeks
@@ -150,15 +232,26 @@ class FLCourses:
 		"""
 		#print "Looking up duration: %s" % _run_details_url
 
-		duration = 0
 		if(self.__isAdmin):
-			soup = BeautifulSoup(self.__session.get(_run_details_url).content, 'html.parser')
-			#run_data = soup.findAll('span',class_ = 'm-key-info__data')
-			run_data = soup.findAll('span',class_ = 'm-metadata__title')
-			if(run_data):
-				for run_datum in run_data:
-					if("Duration" in run_datum.string):
-						duration = run_datum.string.replace('Duration','').replace('weeks','').strip()
+			return self.parseRunDuration(self.__session.get(_run_details_url))
+		self.__logger.error("Unable to parse duration")
+		return 0
+
+	def parseRunDuration(self, response):
+		""" Find the duration of the course, in weeks, in the run details page
+
+		:param response: The response of the run details url.
+		:return:
+		"""
+
+		duration = 0
+		soup = BeautifulSoup(response.content, 'html.parser')
+		#run_data = soup.findAll('span',class_ = 'm-key-info__data')
+		run_data = soup.findAll('span',class_ = 'm-metadata__title')
+		if(run_data):
+			for run_datum in run_data:
+				if("Duration" in run_datum.string):
+					duration = run_datum.string.replace('Duration','').replace('weeks','').strip()
 
 		if(duration == 0):
 			self.__logger.error("Unable to parse duration")
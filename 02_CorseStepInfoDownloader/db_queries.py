@@ -31,9 +31,10 @@
 
 import pandas as pd
 import MySQLdb
+import MySQLdb.cursors
 
 class DBConnection:
-	def __init__(self,db_host,db_name,db_user,db_pass):
+	def __init__(self,db_host,db_name,db_user,db_pass,fetch_size=1000):
 		"""Connect to database and query tables.
 
 			:param:
@@ -41,7 +42,9 @@ class DBConnection:
 			    db_name: The database name
 			    db_user: The database user
 			    db_pass: The user's password
+			    fetch_size: The number of rows read from the server at a time by streamQuery and streamProcedure
 		"""
+		self.__fetch_size = fetch_size
 		# Create connection to database
 		self.__db = MySQLdb.connect(host=db_host,
 							 user=db_user,
@@ -50,42 +53,119 @@ class DBConnection:
 							 charset='utf8',
 							 use_unicode=True)
 
+	def streamQuery(self,query,args=None,fetch_size=None):
+		"""
+			This function runs a query with a server-side (unbuffered) cursor and yields its rows, reading
+			fetch_size rows at a time, so the whole result is never held in memory.
+			The connection cannot run another query until all the rows have been read or the generator is closed.
+		:param query: the SQL query.
+		:param args: the arguments of the query.
+		:param fetch_size: the number of rows read at a time, the fetch_size of the connection by default.
+		:return: a generator of the rows.
+		"""
+		cursor = self.__db.cursor(MySQLdb.cursors.SSCursor)
+		cursor.execute(query, args)
+		return self.__iterRows(cursor, fetch_size)
+
+	def streamProcedure(self,procname,args=(),fetch_size=None):
+		"""
+			This function calls a store procedure with a server-side (unbuffered) cursor and yields the rows
+			of its result, like streamQuery.
+		:param procname: the name of the store procedure.
+		:param args: the arguments of the store procedure.
+		:param fetch_size: the number of rows read at a time, the fetch_size of the connection by default.
+		:return: a generator of the rows.
+		"""
+		cursor = self.__db.cursor(MySQLdb.cursors.SSCursor)
+		cursor.callproc(procname, args)
+		return self.__iterRows(cursor, fetch_size)
+
+	# The same as iter_rows, stream_query and stream_procedure in 03_ExportsDownloader/db_stream.py, each folder
+	# runs on its own so it keeps its own copy: a change to one should be made to the other.
+	def __iterRows(self,cursor,fetch_size):
+		try:
+			while True:
+				rows = cursor.fetchmany(fetch_size or self.__fetch_size)
+				if not rows:
+					break
+				for row in rows:
+					yield row
+		finally:
+			# Closing the cursor reads what is left of the result, and the status result of a store procedure.
+			cursor.close()
+
 	def insertCourseFileInformationFromCSV(self):
 		"""
 				The function insert the data from the CourseSlugFileInfo csv file to database which
 				are the files available for download of any course.
-				There is the 'insert_course_file_information' store procedure in the database that
-				handle such insertion.
+				All the rows are inserted at once by insertCourseFileInformationBulk.
 		:return:
 		"""
 		courseSlug_datasets = "CourseSlugFileInfo.csv"
 		df = pd.read_csv(courseSlug_datasets)
 
+		# The file id is 'None' for the files missing from the file_information table, these rows are left out.
+		df['file_id'] = pd.to_numeric(df['file_id'], errors='coerce')
+		df = df[df['course_id'].notnull() & df['file_id'].notnull()]
+		self.insertCourseFileInformationBulk([[int(row['course_id']), int(row['file_id'])] for _, row in df.iterrows()])
+
+	def insertCourseFileInformationBulk(self,rows):
+		"""
+			This function insert the files available for download of many courses with a few statements, instead of
+			a call of the insert_course_file_information store procedure per file.
+			The rows go to a temporary table in one multi-row insert, then the
+			'merge_course_file_information_staging' store procedure inserts the ones that are not in the database yet.
+		:param rows: a list of [course id, file id].
+		:return:
+		"""
 		cursor = self.__db.cursor()
-		for row in df.iterrows():
-			args = [row[1]['course_id'],row[1]['file_id']]
-			cursor.callproc("insert_course_file_information", args)
+		cursor.execute("DROP TEMPORARY TABLE IF EXISTS course_file_information_staging;")
+		cursor.execute("CREATE TEMPORARY TABLE course_file_information_staging (course_id int(11), file_id int(11));")
+		if len(rows) > 0:
+			cursor.executemany("INSERT INTO course_file_information_staging (course_id, file_id) VALUES (%s, %s)", rows)
+		cursor.callproc("merge_course_file_information_staging")
+		cursor.close()
+		cursor = self.__db.cursor()
+		cursor.execute("DROP TEMPORARY TABLE course_file_information_staging;")
 		self.__db.commit()
 		cursor.close()
 
 	def insertCourseInformationFromCSV(self):
 		"""
 				This function insert/update the course information from CourseSlugData csv file to database.
-				There is the 'update_course_information' store procedure in the database that
-				handle such insertion or update.
+				All the courses are inserted or updated at once by updateCourseInformationBulk.
 		:return:
 		"""
 		courseSlug_datasets = "CourseSlugData.csv"
 		df = pd.read_csv(courseSlug_datasets)
+		df = df.astype(object).where(df.notnull(), None)
 
-		cursor = self.__db.cursor()
+		self.updateCourseInformationBulk([[row['course_name'],row['course_name_fl']
+					, row['duration_week'],row['end_date']
+					,row['start_date'],row['version']
+					,row['active'],row['status'],row['organisation']] for _, row in df.iterrows()])
 
-		for row in df.iterrows():
-			args = [row[1]['course_name'],row[1]['course_name_fl']
-					, row[1]['duration_week'],row[1]['end_date']
-					,row[1]['start_date'],row[1]['version']
-					,row[1]['active'],row[1]['status'],row[1]['organisation']]
-			cursor.callproc("update_course_information", args)
+	def updateCourseInformationBulk(self,rows):
+		"""
+			This function insert/update many courses with a few statements, instead of a call of the
+			update_course_information store procedure per course.
+			The courses go to a temporary table in one multi-row insert, then the
+			'merge_course_information_staging' store procedure updates the courses in the database and inserts the others.
+		:param rows: a list of the fields of the update_course_information store procedure
+					 (course_name, course_name_fl, duration_week, end_date, start_date, version, active, status, organisation).
+		:return:
+		"""
+		cursor = self.__db.cursor()
+		cursor.execute("DROP TEMPORARY TABLE IF EXISTS course_information_staging;")
+		cursor.execute("CREATE TEMPORARY TABLE course_information_staging LIKE course_information;")
+		if len(rows) > 0:
+			cursor.executemany("INSERT INTO course_information_staging "
+							   "(course_name, course_name_fl, duration_week, end_date, start_date, version, active, status, organisation) "
+							   "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)", rows)
+		cursor.callproc("merge_course_information_staging")
+		cursor.close()
+		cursor = self.__db.cursor()
+		cursor.execute("DROP TEMPORARY TABLE course_information_staging;")
 		self.__db.commit()
 		cursor.close()
 
@@ -105,19 +185,65 @@ class DBConnection:
 			return -1
 		return course_information[0][0]
 
-	def getFileInformation(self):
+	def getCourseIds(self):
 		"""
-			This function return the files available for all courses from the data base.
-			The get_file_information store procedure has the logic.
+			This function returns the ids of all courses from database, to look them up without a query per course.
+			The get_course_ids store procedure has the logic.
+		:return: a dictionary of (course slug, version) to course id, the version is a string.
+		"""
+		course_ids = {}
+		for c in self.streamProcedure('get_course_ids'):
+			course_ids[(c[1], str(c[2]))] = c[0]
+		return course_ids
+
+	def getFinishedCourseRuns(self):
+		"""
+			This function returns the metadata of the finished courses that does not change any more.
+			The get_finished_course_runs store procedure has the logic.
+		:return: a dictionary of (course slug, version) to {'duration_week': ..., 'datasets': [file names]}, the version is a string.
+				 The runs without a duration are left out, so their pages are fetched again.
+		"""
+		runs_dic = {}
+		for r in self.streamProcedure('get_finished_course_runs'):
+			if r[2] is None:
+				continue
+			run = runs_dic.setdefault((r[0], str(r[1])), {'duration_week': int(r[2]), 'datasets': []})
+			if r[3] is not None:
+				run['datasets'].append(r[3])
+		return runs_dic
+
+	def getStepInfoFingerprints(self):
+		"""
+			This function returns the size and content hash of the step info file last loaded for each course.
+			The get_course_step_info_fingerprints store procedure has the logic.
+		:return: a dictionary of course id to (file size, content hash).
+		"""
+		fingerprints_dic = {}
+		for f in self.streamProcedure('get_course_step_info_fingerprints'):
+			fingerprints_dic[f[0]] = (f[1], f[2])
+		return fingerprints_dic
+
+	def updateStepInfoFingerprint(self,course_id,file_size,content_hash):
+		"""
+			This function records the step info file loaded for a course, with the update_course_step_info_fingerprint store procedure.
+		:param course_id: the id of the course in the course_information table.
+		:param file_size: the size of the step info file.
+		:param content_hash: the sha1 of the content of the step info file.
 		:return:
 		"""
 		cursor = self.__db.cursor()
-		cursor.callproc('get_file_information')
-		file_names = cursor.fetchall()
+		cursor.callproc("update_course_step_info_fingerprint", [course_id, file_size, content_hash])
+		self.__db.commit()
 		cursor.close()
 
+	def getFileInformation(self):
+		"""
+			This function return the files available for all courses from the data base.
+			The get_file_information store procedure has the logic.
+		:return:
+		"""
 		file_names_dic = {}
-		for f in file_names:
+		for f in self.streamProcedure('get_file_information'):
 			file_names_dic[f[1]] = f[0]
 		return file_names_dic
 
@@ -127,13 +253,8 @@ class DBConnection:
 			The get_inprogress_courses store procedure has the logic.
 		:return:
 		"""
-		cursor = self.__db.cursor()
-		cursor.callproc('get_inprogress_courses')
-		courses = cursor.fetchall()
-		cursor.close()
-
 		list_courses = []
-		for c in courses:
+		for c in self.streamProcedure('get_inprogress_courses'):
 			list_courses.append([c[0],c[1]])
 
 		return list_courses
@@ -144,13 +265,8 @@ class DBConnection:
 			The get_active_courses store procedure has the logic.
 		:return:
 		"""
-		cursor = self.__db.cursor()
-		cursor.callproc('get_active_courses')
-		courses = cursor.fetchall()
-		cursor.close()
-
 		list_courses = []
-		for c in courses:
+		for c in self.streamProcedure('get_active_courses'):
 			list_courses.append([c[0],c[1]])
 
 		return list_courses
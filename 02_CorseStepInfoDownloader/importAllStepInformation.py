@@ -33,20 +33,21 @@
 # ---------------------------------------------------------------------------------
 
 # Libraries
-import re
 import logging
+import hashlib
 import ConfigParser
 import os
 import time
 import string
-from lxml import html
-from lxml import etree
 import csv
 import pandas as pd
 from sqlalchemy import create_engine
 from login import login
-from courses_run import FLCourses
+from courses_run import FLCourses, getAdminUrl
 from db_queries import DBConnection
+from page_fetcher import PageFetcher
+from page_cache import PageCache, parse_ttls
+from page_extractor import extract_course, extract_week, extract_step_content
 
 
 class ConfigParameters:
@@ -59,6 +60,7 @@ class ConfigParameters:
         self.config.read(config_file)
         self.step_export_enable = self.config.getboolean("step_info", "export_enable")
         self.step_db_export_enable = self.config.getboolean("step_info", "db_export_enable")
+        self.step_db_export_incremental = self.config.getboolean("step_info", "db_export_incremental")
         self.wait_time_seconds = self.config.getint("general", "wait_time_seconds")
         self.username = self.config.get("general", "username")
         self.password = self.config.get("general", "password")
@@ -67,10 +69,14 @@ class ConfigParameters:
         self.db_name = self.config.get("database", "db_name")
         self.db_user = self.config.get("database", "db_user")
         self.db_pass = self.config.get("database", "db_pass")
+        self.db_fetch_size = self.config.getint("database", "fetch_size")
         self.course_db_export_enable = self.config.getboolean("course_info", "db_export_enable")
         self.course_export_enable = self.config.getboolean("course_info", "export_enable")
+        self.reuse_finished_runs = self.config.getboolean("course_info", "reuse_finished_runs")
         self.use_inprogress_courses = self.config.getboolean("general", "use_inprogress_courses")
         self.use_active_courses = self.config.getboolean("general", "use_active_courses")
+        self.scrape_workers = self.config.getint("step_info", "scrape_workers")
+        self.requests_per_second = self.config.getfloat("step_info", "requests_per_second")
         if len(self.username.strip()) == 0 or len(self.password.strip()) == 0:
             self.logger.error("Username or Password is blank... Fill it in, in the config, Aborting now....")
             exit()
@@ -80,7 +86,7 @@ class ConfigParameters:
             self.logger.error("Database connection is blank... Fill it in, in the config, Aborting now....")
             exit()
         # Create connection to database
-        self.db = DBConnection(self.db_host, self.db_name, self.db_user, self.db_pass)
+        self.db = DBConnection(self.db_host, self.db_name, self.db_user, self.db_pass, self.db_fetch_size)
 
         # Get a list of all active courses
         if self.config.getboolean("general", "use_course_slugs") is True:
@@ -107,11 +113,38 @@ class ConfigParameters:
             if not os.path.exists(self.output_path):
                 os.makedirs(self.output_path)
 
-def getStepContents(cp, driver, step_urls, course_slug, version, this_week_number):
+        # The pages of the website are kept in the page cache folder, or in the page_cache folder of the output path.
+        self.page_cache = None
+        if self.config.getboolean("page_cache", "enable"):
+            page_cache_folder = self.config.get("page_cache", "folder")
+            if len(page_cache_folder.strip()) == 0:
+                page_cache_folder = os.path.join(self.output_path, 'page_cache')
+            self.page_cache = PageCache(page_cache_folder, self.config.getint("page_cache", "max_megabytes") * 1024 * 1024,
+                                        parse_ttls(self.config.get("page_cache", "ttls")),
+                                        self.config.getint("page_cache", "default_ttl"),
+                                        self.config.getboolean("page_cache", "offline"))
+
+    def isOffline(self):
+        # Replaying the pages of the cache, without logging into the website.
+        return self.page_cache is not None and self.page_cache.offline
+
+    def login(self):
+        """
+            Log into FutureLearn, unless the page cache is offline.
+        :return: The session (None when offline) and True if it is logged in.
+        """
+        if self.isOffline():
+            self.logger.info("The page cache is offline, the pages are only read from the cache.")
+            return None, True
+        loginInfo, rep = login(self.username, self.password, 'https://www.futurelearn.com/sign-in')
+        return loginInfo, rep.status_code == 200
+
+def getStepContents(cp, fetcher, step_urls, course_slug, version, this_week_number):
     """
         Script the FutureLearn website to find the step content.
+        The step pages are fetched at the same time by the workers of the fetcher, the contents are in the order of step_urls.
     :param  cp: The instance of ConfigParameters class that has all the parameters from config file.
-            driver: A session requests object to get the html content of a webpage.
+            fetcher: The PageFetcher of the logged in session, to get the html content of a webpage.
             step_urls: The url to go to the step.
             course_slug: The course slug from futurelearn website. (e.g. remaking-nature)
             version: The version or run of the course.
@@ -122,18 +155,17 @@ def getStepContents(cp, driver, step_urls, course_slug, version, this_week_numbe
     cp.logger.info(
         "Grabing step content at week {0} for course: '{1}/{2}'".format(this_week_number, course_slug, version))
 
-    for url in step_urls:
-        res = driver.get(url)
-        new_url = res.url
+    driver = fetcher.session
+    # The response of a step url is the page it redirects to, so it is not requested again.
+    for url, response in zip(step_urls, fetcher.get_all(step_urls)):
+        new_url = response.url
 
         if "quick_enrol" in new_url:
-            response = driver.get(new_url)
             if response.status_code == 200:
                 # Click the enrol button
                 driver.find_element_by_css_selector("input.a-button[type='submit']").click()
                 time.sleep(cp.wait_time_seconds)
-                res = driver.get(url)
-                new_url = res.url
+                response = fetcher.get(url)
             else:
                 cp.logger.info(
                     "Having a problem automatically enrolling into the course: '{0}/{1}'".format(course_slug, version))
@@ -141,26 +173,12 @@ def getStepContents(cp, driver, step_urls, course_slug, version, this_week_numbe
                 cp.logger.info("Moving to the next course now.")
                 continue
 
-        response = driver.get(new_url)
-
         if response.status_code == 200:
-            # Parse html into a DOM tree
-            html_content = response.content
-            tree = html.fromstring(html_content)
-
             try:
-                elem = tree.xpath("""//*[@id="main-content"]/article/section/div/div[2]/div/div[2]""")
-                source_code = map(etree.tostring, elem)
-                steps.append(source_code)
-                # print source_code
+                steps.append(extract_step_content(response.content))
             except Exception, e:
-                try:
-                    elem = tree.xpath("""//*[@id="main-content"]/article/section/div/div[2]/div/div/div[3]""")
-                    source_code = map(etree.tostring, elem)
-                    steps.append(source_code[0])
-                except Exception, e:
-                    cp.logger.error("No Content at step url {0}".format(url))
-                    steps.append('Got error')
+                cp.logger.error("No Content at step url {0}".format(url))
+                steps.append('Got error')
 
     cp.logger.info(
         "Finished Grabing step content of week {0} for course: '{1}/{2}'".format(this_week_number, course_slug,
@@ -176,9 +194,10 @@ def getStepInformation(cp):
     """
     # Log into FutureLearn -------------------------------------------------------------
     cp.logger.info("Logging into the futurelearn website (wait 5 seconds)")
-    loginInfo, rep = login(cp.username, cp.password, 'https://www.futurelearn.com/sign-in')
+    loginInfo, logged_in = cp.login()
+    fetcher = PageFetcher(loginInfo, cp.scrape_workers, cp.requests_per_second, cp.page_cache)
     # Grab the Step Assets -----------------------------------------------------------
-    cp.logger.info("Downloading steps information for each course")
+    cp.logger.info("Downloading steps information for each course with {0} workers".format(cp.scrape_workers))
 
     # for course_slug, version in course_slugs_info:
     for a_course in cp.active_courses:
@@ -186,7 +205,8 @@ def getStepInformation(cp):
         version = str(a_course[1])
         print course_slug + '- ' + version
         output_filepath = cp.output_path + os.sep + "{0}-{1}-step_info.csv".format(course_slug, version)
-        if (os.path.isfile(output_filepath)):
+        # When replaying the page cache the files are written again, from the cached pages.
+        if (os.path.isfile(output_filepath)) and not cp.isOffline():
             cp.logger.info("Found the file for: '{0}/{1}' at {2}".format(course_slug, version, output_filepath))
             continue
 
@@ -196,7 +216,7 @@ def getStepInformation(cp):
         # Step 1: Go to the course /todo/ page, it will re-direct, just wait.
         cp.logger.debug("Step 1: Go to the course")
         url = "https://www.futurelearn.com/courses/" + course_slug + "/" + version + "/todo/"
-        res = loginInfo.get(url)
+        res = fetcher.get(url)
         new_url = res.url
 
         # FL have changed thelogin process that it goes to the register page
@@ -231,8 +251,8 @@ def getStepInformation(cp):
                 cp.logger.info("Moving to the next course now.")
                 continue
 
-        # After being re-directed...
-        response = loginInfo.get(new_url)
+        # After being re-directed... (res is already the page it redirected to)
+        response = res
         if response.status_code == 200:
             html_content = response.content
         else:
@@ -242,65 +262,44 @@ def getStepInformation(cp):
 
         # Step 2: Grab the week urls, from the main redirect page.
         cp.logger.debug("Step 2: Grab Week URLs")
-        week_urls = []  # These are the urls to each of the weeks within a course.
-        suffixes = set(re.findall("/courses/" + course_slug + "/" + version + "/todo/[0-9]+", html_content))
-
+        # Grab the Week and Date information, stored in lists in the correct week order (i.e. index 0 = week 1, etc.)
+        # The week urls are sorted, so the weeks are always fetched and logged in the same order.
+        course_record = extract_course(html_content, course_slug, version)
         prefix = "https://www.futurelearn.com"
-        for suffix in suffixes:
-            week_url = prefix + suffix
-            week_urls.append(week_url)
-
-        # Grab the Week and Date information
-        tree = html.fromstring(html_content)
-
-        # Stored in a list, in the correct week order (i.e. index 0 = week 1, etc.)
-        week_labels = tree.xpath("""//*[@class="m-run-progress-nav__itembox__label"]/text()""")  # e.g. 'Week'
-        week_numbers = tree.xpath("""//*[@class="m-run-progress-nav__itembox__number"]/text()""")  # e.g. '1'
-        week_dates = tree.xpath("""//*[@class="date"]/@datetime""")  # e.g. '2016-01-11'
-        week_dates_str = tree.xpath("""//*[@class="date"]/text()""")  # e.g. '11 Jan'
+        week_urls = [prefix + suffix for suffix in course_record.week_urls]  # These are the urls to each of the weeks within a course.
+        week_labels = course_record.week_labels  # e.g. 'Week'
+        week_numbers = course_record.week_numbers  # e.g. '1'
+        week_dates = course_record.week_dates  # e.g. '2016-01-11'
+        week_dates_str = course_record.week_dates_str  # e.g. '11 Jan'
 
         # Step 3: Iterate through each week url, and pick up the step information
         cp.logger.debug("Step 3: Iterate through each week")
-        df_final = pd.DataFrame()
+        # The weeks are concatenated once they are all processed, appending them one at a time copies all the previous ones.
+        week_frames = []
 
         # these are not guaranteed to be in week order, since the URL numbering does not have to be ascending
-        for week_url in week_urls:
+        # The week pages are fetched at the same time, then processed one after the other.
+        for week_url, response in zip(week_urls, fetcher.get_all(week_urls)):
             cp.logger.info("Processing the week url : {0}".format(week_url))
-            response = loginInfo.get(week_url)
             df_week = pd.DataFrame()
 
             if response.status_code == 200:
-                html_content = response.content
-
-                # Parse html into a DOM tree
-                tree = html.fromstring(html_content)
-
-                # Grab the week heading.
-                week_heading = tree.xpath("""//*[@class="u-hidden-small"]/text()""")  # e.g. 'Week 6: Conclusion'
+                # Grab the week heading, the steps, their links, titles and asset types (e.g. video (01:28), article, etc.)
+                week_record = extract_week(response.content)
+                week_heading = week_record.week_heading  # e.g. 'Week 6: Conclusion'
 
                 # Grab the week_index (week number - 1) - so we can relate back to the week and date information pulled earlier.
-                this_week_number = int(week_heading[0].split(":")[0][5:].strip())
+                this_week_number = week_record.week_number
                 week_index = this_week_number - 1
 
-                # Grab the steps
-                steps = tree.xpath(
-                    """//*[@id="main-content"]/section/div/div/ol/li/ol/li/a/span/div/text()""")  # e.g. [1.1,1.2,etc.]
-
-                # Grab the link to steps
-                step_links = tree.xpath(
-                    """//*[@id="main-content"]/section/div/div/ol/li/ol/li/a/@href""")  # e.g. ["/courses/through-engineers-eyes/1/steps/78619",etc.]
-                step_links = [prefix + step_link for step_link in step_links]
+                steps = week_record.step_numbers  # e.g. [1.1,1.2,etc.]
+                step_links = [prefix + step_link for step_link in week_record.step_links]
 
                 # Grab the step contents
-                step_contents = getStepContents(cp, loginInfo, step_links, course_slug, version, this_week_number)
-
-                # Grab the titles
-                titles = tree.xpath("""//*[@class="m-composite-link__primary"]/text()""")
-                titles = [title.strip() for title in titles]
+                step_contents = getStepContents(cp, fetcher, step_links, course_slug, version, this_week_number)
 
-                # Grab the asset types (e.g. video (01:28), article, etc.)
-                asset_types = tree.xpath("""//*[@class="m-composite-link__secondary type"]/text()""")
-                asset_types = [asset_type.strip() for asset_type in asset_types]
+                titles = week_record.titles
+                asset_types = week_record.asset_types
 
                 # So far covers: 'video', 'article', 'quiz', 'discussion', 'test' and any other one word tags.
                 # If there are special cases, add them in here as required. (e.g. video is a special case for example)
@@ -342,7 +341,7 @@ def getStepInformation(cp):
                     df_week['step_url'] = step_links
                     df_week['step_content'] = step_contents
 
-                    df_final = df_final.append(df_week)  # concatenate weeks, into a larger df
+                    week_frames.append(df_week)
 
                 else:
                     cp.logger.info("Couldn't find step info for course {0} at week {1}".format(course_slug, week_url))
@@ -358,6 +357,7 @@ def getStepInformation(cp):
         # Step 4: Write-out the 'course dataframe' describing the steps
         cp.logger.debug("Step 4: Write out the file")
 
+        df_final = pd.concat(week_frames) if week_frames else pd.DataFrame()  # concatenate weeks, into a larger df
         row_count = df_final.shape[0]
         if row_count > 0:
             # To deal with the fact that steps are not properly sorted (even if using the step_number column as key),
@@ -378,8 +378,60 @@ def getStepInformation(cp):
                 "*** Note: *** (course: '{0}/{1}') has 0 rows, not writing out a file with 0 steps.".format(course_slug,
                                                                                                             version))
 
+    fetcher.close()
     cp.logger.info("FutureLearn step scraper finished")
 
+STEP_INFO_DTYPE = {'step_number': 'object', 'title': 'object', 'type': 'object', 'duration': 'object',
+                   'duration_secs': 'float', 'week_label': 'object', 'week_datetime': 'object', 'week_date': 'object',
+                   'week_heading': 'object', 'step_url': 'object', 'step_content': 'object'}
+
+def listStepInfoFiles(output_path, get_course_id):
+    """
+        Find the <course_slug>-<version>-step_info.csv files of a folder.
+    :param output_path: The folder of the step info files.
+    :param get_course_id: The function of (course_slug, version) to course id, e.g. DBConnection.getCourseId.
+    :return: The list of (file path, course id), the course id is -1 for an unknown course.
+    """
+    files = []
+    for filepath in sorted(os.listdir(output_path)):
+        # Skip the other files and folders of the output path (e.g. the page cache).
+        if not filepath.endswith('-step_info.csv'):
+            continue
+        course_slug = filepath[0:filepath.find('-step_info')]
+        course_name = course_slug[0:course_slug.rfind('-')]
+        version = course_slug[course_slug.rfind('-') + 1:]
+        files.append((output_path + os.sep + filepath, get_course_id(course_name, version)))
+    return files
+
+def readStepInfoFile(filepath, course_id):
+    df = pd.read_csv(filepath, dtype=STEP_INFO_DTYPE)
+    df['course_id'] = course_id
+    return df
+
+def getStepInfoFingerprint(filepath):
+    """
+        The size and sha1 of the content of a step info file, to find the files that have changed since they were loaded.
+    """
+    content_hash = hashlib.sha1()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            content_hash.update(chunk)
+    return os.path.getsize(filepath), content_hash.hexdigest()
+
+def readStepInfoFiles(output_path, get_course_id):
+    """
+        Read all the <course_slug>-<version>-step_info.csv files of a folder into one DataFrame.
+        The files are concatenated once they are all read, so the time taken grows linearly with the number of files.
+    :param output_path: The folder of the step info files.
+    :param get_course_id: The function of (course_slug, version) to course id, e.g. DBConnection.getCourseId.
+    :return: The DataFrame of all the steps, with their course_id (-1 for an unknown course).
+    """
+    dmap = dict(STEP_INFO_DTYPE, course_id='int32')
+    frames = [pd.DataFrame({k: pd.Series(dtype=v) for k, v in dmap.items()})]
+    for filepath, course_id in listStepInfoFiles(output_path, get_course_id):
+        frames.append(readStepInfoFile(filepath, course_id))
+    return pd.concat(frames)
+
 def loadStepInfoToDatabase(cp):
     """
         Load all step file information into the database.
@@ -393,29 +445,49 @@ def loadStepInfoToDatabase(cp):
                                                                     , cp.db_host, cp.db_name))
 
     table_name = 'course_information_details'
-    dmap = {'course_id': 'int32', 'step_number': 'object', 'title': 'object', 'type': 'object', 'duration': 'object',
-            'duration_secs': 'float', 'week_label': 'object', 'week_datetime': 'object', 'week_date': 'object',
-            'week_heading': 'object', 'step_url': 'object', 'step_content': 'object'}
-    csv_dtype = {'step_number': 'object', 'title': 'object', 'type': 'object', 'duration': 'object',
-                 'duration_secs': 'float', 'week_label': 'object', 'week_datetime': 'object', 'week_date': 'object',
-                 'week_heading': 'object', 'step_url': 'object', 'step_content': 'object'}
-
-    course_info_df = pd.DataFrame({k: pd.Series(dtype=v) for k, v in dmap.items()})
-    for filepath in os.listdir(cp.output_path):
-        course_slug = filepath[0:filepath.find('-step_info')]
-        course_name = course_slug[0:course_slug.rfind('-')]
-        version = course_slug[course_slug.rfind('-') + 1:]
+    if cp.step_db_export_incremental and engine.has_table(table_name):
+        loadChangedStepInfoToDatabase(cp, engine, table_name)
+    else:
+        course_info_df = readStepInfoFiles(cp.output_path, cp.db.getCourseId)
+        course_info_df.to_sql(con=engine, name=table_name, if_exists='replace', flavor='mysql')
+        # The incremental loads replace the rows of a course at a time.
+        engine.execute("ALTER TABLE `{0}` ADD KEY `course_information_details_course_idx` (`course_id`);".format(table_name))
+        for filepath, course_id in listStepInfoFiles(cp.output_path, cp.db.getCourseId):
+            if course_id != -1:
+                cp.db.updateStepInfoFingerprint(course_id, *getStepInfoFingerprint(filepath))
 
-        course_information = cp.db.getCourseId(course_name, version)
+    cp.logger.info("Completed loading the csv files to futurelearn_courses_information database.")
 
-        # Load CSV file to the <course_slug>-<version> database
-        df = pd.read_csv(cp.output_path + os.sep + filepath, dtype=csv_dtype)
-        df['course_id'] = course_information
-        course_info_df = course_info_df.append(df)
+def loadChangedStepInfoToDatabase(cp, engine, table_name):
+    """
+        Load the step info files that are new or have changed since they were last loaded.
+        The rows of a course are deleted and inserted again in one transaction, so the table can be queried
+        during the load and shows either the previous or the new steps of the course.
+    :param cp: The instance of ConfigParameters class that has all the parameters from config file.
+    :param engine: The sqlalchemy engine of the futurelearn_courses_information database.
+    :param table_name: course_information_details
+    :return:
+    """
+    fingerprints = cp.db.getStepInfoFingerprints()
+    loaded = 0
+    for filepath, course_id in listStepInfoFiles(cp.output_path, cp.db.getCourseId):
+        if course_id == -1:
+            cp.logger.warn("{0} is not in the course_information table, it is not loaded.".format(filepath))
+            continue
 
-    course_info_df.to_sql(con=engine, name=table_name, if_exists='replace', flavor='mysql')
+        fingerprint = getStepInfoFingerprint(filepath)
+        if fingerprints.get(course_id) == fingerprint:
+            continue
 
-    cp.logger.info("Completed loading the csv files to futurelearn_courses_information database.")
+        df = readStepInfoFile(filepath, course_id)
+        with engine.begin() as connection:
+            connection.execute("DELETE FROM `{0}` WHERE course_id = %s;".format(table_name), course_id)
+            df.to_sql(con=connection, name=table_name, if_exists='append', flavor='mysql')
+        cp.db.updateStepInfoFingerprint(course_id, *fingerprint)
+        loaded += 1
+        cp.logger.info("Loaded {0}".format(filepath))
+
+    cp.logger.info("{0} step info files were new or changed.".format(loaded))
 
 def export_to_csv(cp):
     """
@@ -425,16 +497,37 @@ def export_to_csv(cp):
     """
 
     filenames = cp.db.getFileInformation()
-    loginInfo, rep = login(cp.username, cp.password, 'https://www.futurelearn.com/sign-in')
+    course_ids = cp.db.getCourseIds()
+    loginInfo, logged_in = cp.login()
 
-    if rep.status_code == 200:
+    if logged_in:
         cp.logger.info("Login to FutureLearn website...")
-        courseSlugData = {}
-        for org in cp.organisations:
-            cos = FLCourses(loginInfo, org, cp.logger)
-            cp.logger.info("Retrieving courses for {0}...".format(org))
+        # One pool of workers fetches the admin pages of all the organisations together,
+        # then the run pages of all their runs together.
+        fetcher = PageFetcher(loginInfo, cp.scrape_workers, cp.requests_per_second, cp.page_cache)
+        known_runs = cp.db.getFinishedCourseRuns() if cp.reuse_finished_runs else {}
+        cp.logger.info("Retrieving courses for {0}...".format(", ".join(cp.organisations)))
+        admin_responses = fetcher.get_all([getAdminUrl(org) for org in cp.organisations])
+
+        org_courses = []
+        runs_to_fetch = []
+        for org, admin_response in zip(cp.organisations, admin_responses):
+            cos = FLCourses(fetcher, org, cp.logger, known_runs, admin_response)
+            courses, runs = cos.findCourses()
+            org_courses.append(courses)
+            runs_to_fetch.extend((cos, run) for run in runs)
+
+        # The responses are in the order of the urls.
+        urls = [run[2] for cos, run in runs_to_fetch] + [run[3] for cos, run in runs_to_fetch]
+        responses = fetcher.get_all(urls)
+        for i, (cos, run) in enumerate(runs_to_fetch):
+            cos.setRunPages(run, responses[i], responses[len(runs_to_fetch) + i])
+        fetcher.close()
+        cp.logger.info("Fetched the pages of {0} runs.".format(len(runs_to_fetch)))
 
-            for course_name, runs in cos.getCourses().items():
+        courseSlugData = {}
+        for courses in org_courses:
+            for course_name, runs in courses.items():
                 for run, info in runs.items():
                     if (len(info['datasets']) > 0):
                         courseSlugData[course_name + '=' + run] = info
@@ -457,6 +550,19 @@ def export_to_csv(cp):
                 writer.writerow(line.split('|'))
             f.close()
 
+        # The courses that are not in the database yet are inserted together, then their ids are read back at once.
+        new_courses = []
+        for course_name in courseSlugData.keys():
+            row = courseSlugData[course_name]
+            if (row['course_name_fl'], str(row['version'])) not in course_ids:
+                c = course_name[0:course_name.find('=')]
+                new_courses.append([c, row['course_name_fl'], row['duration_week'], row['end_date']
+                    , row['start_date'], row['version'], row['active'], row['status'], row['organisation']])
+        if len(new_courses) > 0:
+            cp.logger.info("Inserting {0} new courses into database...".format(len(new_courses)))
+            cp.db.updateCourseInformationBulk(new_courses)
+            course_ids = cp.db.getCourseIds()
+
         courseSlug_datasets = "CourseSlugFileInfo.csv"
         with open(courseSlug_datasets, 'w') as f:
             writer = csv.writer(f)
@@ -464,14 +570,7 @@ def export_to_csv(cp):
             for course_name in courseSlugData.keys():
                 row = courseSlugData[course_name]
                 dataset = row['datasets']
-                c = course_name[0:course_name.find('=')]
-                args = [c, row['course_name_fl'], row['duration_week'], row['end_date']
-                    , row['start_date'], row['version'], row['active'], row['status'], row['organisation']]
-                course_id = cp.db.getCourseId(row['course_name_fl'], row['version'], args)
-
-                if course_id == -1:
-                    cp.db.insertCourseInformation(args)
-                    course_id = cp.db.getCourseId(row['course_name_fl'], row['version'])
+                course_id = course_ids.get((row['course_name_fl'], str(row['version'])), -1)
 
                 for d in dataset:
                     line = '{0},{1},{2},{3},{4}'.format(row['course_name_fl'], row['version']
@@ -481,24 +580,34 @@ def export_to_csv(cp):
     else:
         cp.logger.error("Failed to login to FutureLearn website.")
 
-# Entry point
-cp = ConfigParameters('config.txt')
-
-if cp.step_export_enable:
-    getStepInformation(cp)
-
-if cp.step_db_export_enable:
-    loadStepInfoToDatabase(cp)
-
-if cp.course_export_enable:
-    export_to_csv(cp)
-
-if cp.course_db_export_enable:
-    cp.logger.info("Inserting the data at CourseSlugData.csv file into database...")
-    cp.db.insertCourseInformationFromCSV()
-    cp.logger.info("Finished inserting!")
-    cp.logger.info("Inserting the data at CourseSlugFileInfo.csv file into database...")
-    cp.db.insertCourseFileInformationFromCSV()
-    cp.logger.info("Finished inserting!")
+# Entry point, the benchmarks import this module without running it.
+if __name__ == '__main__':
+    cp = ConfigParameters('config.txt')
+
+    # The index of the page cache is written even if the run fails or exits early.
+    try:
+        if cp.step_export_enable:
+            getStepInformation(cp)
+
+        if cp.step_db_export_enable:
+            loadStepInfoToDatabase(cp)
+
+        if cp.course_export_enable:
+            export_to_csv(cp)
+
+        if cp.course_db_export_enable:
+            cp.logger.info("Inserting the data at CourseSlugData.csv file into database...")
+            cp.db.insertCourseInformationFromCSV()
+            cp.logger.info("Finished inserting!")
+            cp.logger.info("Inserting the data at CourseSlugFileInfo.csv file into database...")
+            cp.db.insertCourseFileInformationFromCSV()
+            cp.logger.info("Finished inserting!")
+    finally:
+        if cp.page_cache is not None:
+            cp.page_cache.close()
+
+    if cp.page_cache is not None:
+        cp.logger.info("Page cache: {0} pages used from the cache, {1} revalidated, {2} fetched.".format(
+            cp.page_cache.hits, cp.page_cache.revalidated, cp.page_cache.misses))
 
 # ----------------------------------------------------------------------------------
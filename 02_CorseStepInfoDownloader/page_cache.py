@@ -0,0 +1,263 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist  and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+# ---------------------------------------------------------------------------------
+#
+# An on-disk cache of the pages of the FutureLearn website, used by the PageFetcher.
+# The body of a page is stored once under the sha1 of its content, and index.json maps each url to the body,
+# the url it redirected to, its ETag/Last-Modified and when it was fetched and last used.
+# A page is used without asking the website for the TTL of its url, after that it is revalidated with a
+# conditional request. The least recently used pages are removed once the bodies take more than max_bytes.
+# The index is written every SAVE_SECONDS and on close, the bodies no entry of the index refers to
+# (e.g. after a crash) are removed when the cache is opened.
+#
+# ---------------------------------------------------------------------------------
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+# The pages of the login and enrolment steps, never cached since they depend on the state of the session.
+NOT_CACHED = re.compile(r"/(sign-in|register|quick_enrol)")
+
+# How often the index is written while pages are added to the cache.
+SAVE_SECONDS = 60
+
+
+class CachedResponse:
+    def __init__(self, url, status_code, content):
+        """The parts of a requests response used by the scrapers, for a page read from the cache.
+
+            :param:
+                url: The url of the page, after the redirects
+                status_code: 200, or 504 when the page is not in the cache of an offline run
+                content: The html of the page
+        """
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+
+
+def parse_ttls(text):
+    """
+        Read the ttls option of the config file.
+    :param text: One '<regular expression> <seconds>' entry per line.
+    :return: The list of (compiled regular expression, seconds).
+    """
+    ttls = []
+    for line in text.split("\n"):
+        if line.strip():
+            pattern, seconds = line.strip().rsplit(None, 1)
+            ttls.append((re.compile(pattern), int(seconds)))
+    return ttls
+
+
+class PageCache:
+    def __init__(self, folder, max_bytes, ttls, default_ttl, offline=False):
+        """Keep the pages of the website in a folder.
+
+            :param:
+                folder: The folder of the bodies and of index.json, created if it does not exist
+                max_bytes: The maximum size of the bodies, the least recently used pages are removed above it
+                ttls: The (regular expression, seconds) list of parse_ttls, the first one matching a url is used
+                default_ttl: The seconds a page whose url matches none of the ttls is used without revalidation
+                offline: If True, the pages are only read from the cache, the website is never requested
+        """
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.ttls = ttls
+        self.default_ttl = default_ttl
+        self.offline = offline
+        self.index_path = os.path.join(folder, 'index.json')
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        entries = {}
+        if os.path.isfile(self.index_path):
+            with open(self.index_path, 'rb') as f:
+                entries = json.load(f)
+
+        # The size of the bodies, each counted once, and the number of urls using each body.
+        self.entries = {}
+        self.total_bytes = 0
+        self.hash_refs = {}
+        for url, entry in entries.items():
+            if os.path.isfile(self.body_path(entry['hash'])):
+                self.add_entry(url, entry)
+        self.remove_orphans()
+        self.saved = time.time()
+
+    def ttl(self, url):
+        for pattern, seconds in self.ttls:
+            if pattern.search(url):
+                return seconds
+        return self.default_ttl
+
+    def body_path(self, content_hash):
+        return os.path.join(self.folder, content_hash + '.html')
+
+    def read(self, url, entry):
+        with open(self.body_path(entry['hash']), 'rb') as f:
+            return CachedResponse(entry['url'], 200, f.read())
+
+    def add_entry(self, url, entry):
+        # Called with the lock held, like remove_entry.
+        self.remove_entry(url)
+        self.entries[url] = entry
+        if entry['hash'] not in self.hash_refs:
+            self.hash_refs[entry['hash']] = 0
+            self.total_bytes += entry['size']
+        self.hash_refs[entry['hash']] += 1
+
+    def remove_entry(self, url):
+        """
+            Remove a url from the index, and its body once no other url uses it.
+        :return: The removed entry, None if the url is not in the index.
+        """
+        entry = self.entries.pop(url, None)
+        if entry is None:
+            return None
+        self.hash_refs[entry['hash']] -= 1
+        if self.hash_refs[entry['hash']] == 0:
+            del self.hash_refs[entry['hash']]
+            self.total_bytes -= entry['size']
+            if os.path.isfile(self.body_path(entry['hash'])):
+                os.remove(self.body_path(entry['hash']))
+        return entry
+
+    def remove_orphans(self):
+        # The bodies (and temporary files) left by a run that stopped before it wrote the index.
+        for name in os.listdir(self.folder):
+            content_hash, extension = os.path.splitext(name)
+            if (extension == '.html' and content_hash not in self.hash_refs) or extension == '.part':
+                os.remove(os.path.join(self.folder, name))
+
+    def lookup(self, url):
+        """
+            Find a page in the cache.
+        :param url: The url requested.
+        :return: (response, headers): the CachedResponse if the page can be used without asking the website (else None),
+                 and the headers of the conditional request revalidating the cached page (empty if there is none).
+        """
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is not None and not os.path.isfile(self.body_path(entry['hash'])):
+                self.remove_entry(url)
+                entry = None
+            if entry is None:
+                if self.offline:
+                    self.misses += 1
+                    return CachedResponse(url, 504, ""), {}
+                return None, {}
+
+            entry['used'] = time.time()
+            if self.offline or time.time() - entry['fetched'] < self.ttl(url):
+                self.hits += 1
+                return self.read(url, entry), {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return None, headers
+
+    def revalidate(self, url):
+        """
+            Use the cached page after the website answered 304 Not Modified.
+        :return: The CachedResponse of the page, None if it has been removed from the cache since the lookup
+                 (it has to be fetched again without the conditional headers).
+        """
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is None:
+                return None
+            try:
+                response = self.read(url, entry)
+            except IOError:
+                self.remove_entry(url)
+                return None
+            entry['fetched'] = entry['used'] = time.time()
+            self.revalidated += 1
+            return response
+
+    def store(self, url, response):
+        """
+            Add the page fetched from the website to the cache, unless it failed or is a login or enrolment page.
+        :param url: The url requested.
+        :param response: The requests response.
+        """
+        if response.status_code != 200 or NOT_CACHED.search(response.url):
+            return
+
+        content_hash = hashlib.sha1(response.content).hexdigest()
+        path = self.body_path(content_hash)
+        if not os.path.isfile(path):
+            fd, temp_path = tempfile.mkstemp(suffix='.part', dir=self.folder)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(response.content)
+            if os.name == 'nt' and os.path.exists(path):
+                os.remove(temp_path)
+            else:
+                os.rename(temp_path, path)
+
+        with self.lock:
+            self.misses += 1
+            self.add_entry(url, {'hash': content_hash, 'url': response.url, 'size': len(response.content),
+                                 'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified'),
+                                 'fetched': time.time(), 'used': time.time()})
+            self.evict()
+            if time.time() - self.saved > SAVE_SECONDS:
+                self.save()
+
+    def evict(self):
+        # The bodies shared by several urls are only counted, and removed, once. Called with the lock held.
+        if self.total_bytes <= self.max_bytes:
+            return
+        for url, entry in sorted(self.entries.items(), key=lambda item: item[1]['used']):
+            if self.total_bytes <= self.max_bytes:
+                break
+            self.remove_entry(url)
+
+    def close(self):
+        """
+            Write the index of the cache.
+        """
+        with self.lock:
+            self.save()
+
+    def save(self):
+        # Through a temporary file, so a crash does not leave a partial index. Called with the lock held.
+        fd, temp_path = tempfile.mkstemp(suffix='.part', dir=self.folder)
+        with os.fdopen(fd, 'wb') as f:
+            json.dump(self.entries, f)
+        if os.name == 'nt' and os.path.exists(self.index_path):
+            os.remove(self.index_path)
+        os.rename(temp_path, self.index_path)
+        self.saved = time.time()
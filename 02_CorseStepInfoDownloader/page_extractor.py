@@ -0,0 +1,95 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist  and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+# ---------------------------------------------------------------------------------
+#
+# Extract the step information from the course, week and step pages of the FutureLearn website.
+# Each page is parsed once, and the XPath expressions are compiled once when the module is imported.
+#
+# ---------------------------------------------------------------------------------
+import re
+from collections import namedtuple
+from lxml import etree
+from lxml import html
+
+# The weeks of a course, from the page the course /todo/ url redirects to. The lists are in week order
+# (i.e. index 0 = week 1, etc.), week_urls are the paths of the week pages.
+CourseRecord = namedtuple('CourseRecord', ['week_urls', 'week_labels', 'week_numbers', 'week_dates', 'week_dates_str'])
+
+# The steps of a week page, one entry per step in each list.
+WeekRecord = namedtuple('WeekRecord', ['week_heading', 'week_number', 'step_numbers', 'step_links', 'titles', 'asset_types'])
+
+WEEK_LABELS = etree.XPath("""//*[@class="m-run-progress-nav__itembox__label"]/text()""")  # e.g. 'Week'
+WEEK_NUMBERS = etree.XPath("""//*[@class="m-run-progress-nav__itembox__number"]/text()""")  # e.g. '1'
+WEEK_DATES = etree.XPath("""//*[@class="date"]/@datetime""")  # e.g. '2016-01-11'
+WEEK_DATES_STR = etree.XPath("""//*[@class="date"]/text()""")  # e.g. '11 Jan'
+
+WEEK_HEADING = etree.XPath("""//*[@class="u-hidden-small"]/text()""")  # e.g. 'Week 6: Conclusion'
+STEP_NUMBERS = etree.XPath("""//*[@id="main-content"]/section/div/div/ol/li/ol/li/a/span/div/text()""")  # e.g. [1.1,1.2,etc.]
+STEP_LINKS = etree.XPath("""//*[@id="main-content"]/section/div/div/ol/li/ol/li/a/@href""")  # e.g. ["/courses/through-engineers-eyes/1/steps/78619",etc.]
+TITLES = etree.XPath("""//*[@class="m-composite-link__primary"]/text()""")
+ASSET_TYPES = etree.XPath("""//*[@class="m-composite-link__secondary type"]/text()""")  # e.g. video (01:28), article, etc.
+
+STEP_CONTENT = etree.XPath("""//*[@id="main-content"]/article/section/div/div[2]/div/div[2]""")
+STEP_CONTENT_FALLBACK = etree.XPath("""//*[@id="main-content"]/article/section/div/div[2]/div/div/div[3]""")
+
+
+def extract_course(html_content, course_slug, version):
+    """
+        Extract the weeks of a course.
+    :param html_content: The html of the page the course /todo/ url redirects to.
+    :param course_slug: The course slug from futurelearn website. (e.g. remaking-nature)
+    :param version: The version or run of the course, as a string.
+    :return: The CourseRecord of the course, its week_urls are sorted.
+    """
+    week_urls = sorted(set(re.findall("/courses/" + course_slug + "/" + version + "/todo/[0-9]+", html_content)))
+    tree = html.fromstring(html_content)
+    return CourseRecord(week_urls, WEEK_LABELS(tree), WEEK_NUMBERS(tree), WEEK_DATES(tree), WEEK_DATES_STR(tree))
+
+
+def extract_week(html_content):
+    """
+        Extract the steps of a week.
+    :param html_content: The html of the week page.
+    :return: The WeekRecord of the week, the step links are paths, the titles and asset types are stripped.
+    """
+    tree = html.fromstring(html_content)
+    week_heading = WEEK_HEADING(tree)
+    # The week number - 1 relates back to the week and date information of the CourseRecord.
+    week_number = int(week_heading[0].split(":")[0][5:].strip())
+    return WeekRecord(week_heading, week_number, STEP_NUMBERS(tree), STEP_LINKS(tree),
+                      [title.strip() for title in TITLES(tree)],
+                      [asset_type.strip() for asset_type in ASSET_TYPES(tree)])
+
+
+def extract_step_content(html_content):
+    """
+        Extract the content of a step.
+    :param html_content: The html of the step page.
+    :return: The list of the html of the content elements, empty if the page has none.
+    """
+    tree = html.fromstring(html_content)
+    elem = STEP_CONTENT(tree)
+    if not elem:
+        elem = STEP_CONTENT_FALLBACK(tree)
+    return [etree.tostring(e) for e in elem]
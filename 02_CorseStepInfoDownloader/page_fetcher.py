@@ -0,0 +1,131 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist  and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+# ---------------------------------------------------------------------------------
+#
+# Fetch the pages of the FutureLearn website from a pool of workers sharing one logged in session.
+# The requests to the website are spaced out by a rate limit shared by all the workers.
+# With a PageCache, the pages are read from the cache while they are fresh and revalidated after that.
+# RateLimiter is the same as the one of 03_ExportsDownloader/export_fetcher.py, each folder runs on its own
+# so it keeps its own copy: a change to one should be made to the other.
+#
+# ---------------------------------------------------------------------------------
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+from urlparse import urlparse
+import requests
+
+
+class RateLimiter:
+    def __init__(self, requests_per_second):
+        """Space out the requests sent to the same host, shared by all the workers.
+
+            :param:
+                requests_per_second: The maximum number of requests per second for each host,
+                                     0 (or less) disables the limit.
+        """
+        if requests_per_second > 0:
+            self.min_interval = 1.0 / requests_per_second
+        else:
+            self.min_interval = 0
+        self.next_request_time = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        """
+            Block the calling thread until a request to the host of the given url is allowed.
+        :param url: The url that is going to be requested.
+        :return:
+        """
+        if self.min_interval == 0:
+            return
+
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.time()
+            request_time = max(now, self.next_request_time.get(host, now))
+            self.next_request_time[host] = request_time + self.min_interval
+
+        if request_time > now:
+            time.sleep(request_time - now)
+
+
+class PageFetcher:
+    def __init__(self, session, workers, requests_per_second, cache=None):
+        """Fetch pages with a logged in session, several at a time.
+
+            :param:
+                session: The requests session returned by login, None when the cache is offline
+                workers: The number of pages fetched at the same time, 1 fetches them one after the other
+                requests_per_second: The maximum number of requests per second sent by all the workers together
+                cache: An optional PageCache
+        """
+        self.session = session
+        self.workers = max(workers, 1)
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.cache = cache
+        # Give each worker its own connection to the website.
+        if self.session is not None:
+            self.session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=self.workers))
+        self.pool = ThreadPool(self.workers) if self.workers > 1 else None
+
+    def get(self, url):
+        """
+            Fetch a page, following the redirects.
+        :param url: The url of the page.
+        :return: The response (or the CachedResponse), its url is the one of the page after the redirects.
+        """
+        headers = {}
+        if self.cache is not None:
+            cached, headers = self.cache.lookup(url)
+            if cached is not None:
+                return cached
+
+        self.rate_limiter.wait(url)
+        response = self.session.get(url, headers=headers)
+        if self.cache is not None:
+            if response.status_code == 304:
+                cached = self.cache.revalidate(url)
+                if cached is not None:
+                    return cached
+                # The page was removed from the cache since the lookup, fetch it again in full.
+                self.rate_limiter.wait(url)
+                response = self.session.get(url)
+            self.cache.store(url, response)
+        return response
+
+    def get_all(self, urls):
+        """
+            Fetch several pages at the same time.
+        :param urls: The urls of the pages.
+        :return: The list of responses, in the order of the urls.
+        """
+        if self.pool is None:
+            return [self.get(url) for url in urls]
+        return self.pool.map(self.get, urls)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
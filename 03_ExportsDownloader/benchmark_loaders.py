@@ -0,0 +1,104 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+# ---------------------------------------------------------------------------------
+#
+# Benchmark of the loader backends (see loaders.py) on a synthetic step_activity file.
+# The file has [benchmark] loader_rows rows, it is loaded by each backend into the step_activity
+# table of the [benchmark] database on the server of the [database] section, and the rows/s are reported.
+#
+# ---------------------------------------------------------------------------------
+import ConfigParser
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta
+import MySQLdb
+from db_pool import ConnectionPool
+from loaders import LoadDataLoader, PandasLoader
+from schema_registry import SchemaRegistry
+
+
+def write_step_activity_file(filepath, row_count):
+    """
+        Write a step_activity export with row_count rows, in the FutureLearn format.
+    """
+    random.seed(0)
+    start = datetime(2017, 1, 9)
+    with open(filepath, 'wb') as f:
+        f.write("learner_id,step,week_number,step_number,first_visited_at,last_completed_at\n")
+        for i in range(row_count):
+            week_number = random.randint(1, 6)
+            step_number = random.randint(1, 20)
+            first_visited_at = start + timedelta(seconds=random.randint(0, 6 * 7 * 24 * 3600))
+            if random.random() < 0.7:
+                last_completed_at = (first_visited_at + timedelta(seconds=random.randint(1, 3600))).strftime('%Y-%m-%d %H:%M:%S UTC')
+            else:
+                last_completed_at = ''
+            f.write("{0:08x}-0000-4000-8000-{1:012x},{2}.{3},{2},{3},{4},{5}\n".format(
+                i % 100000, i, week_number, step_number, first_visited_at.strftime('%Y-%m-%d %H:%M:%S UTC'), last_completed_at))
+
+
+logger = logging.getLogger('futurelearn_loader_benchmark')
+logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %I:%M:%S %p')
+logger.setLevel(logging.INFO)
+
+config = ConfigParser.ConfigParser(allow_no_value=True)
+config.read('config.txt')
+db_host = config.get("database", "db_host")
+db_name = config.get("database", "db_name")
+db_user = config.get("database", "db_user")
+db_pass = config.get("database", "db_pass")
+benchmark_db_name = config.get("benchmark", "database")
+row_count = config.getint("benchmark", "loader_rows")
+
+db = MySQLdb.connect(host=db_host, user=db_user, passwd=db_pass, db=db_name, charset='utf8', use_unicode=True)
+schema = SchemaRegistry(db).get('step_activity')
+types, datetime_columns = schema.types, schema.datetime_columns
+cursor = db.cursor()
+cursor.execute("CREATE DATABASE IF NOT EXISTS `{0}` DEFAULT CHARACTER SET utf8 DEFAULT COLLATE utf8_general_ci;".format(benchmark_db_name))
+cursor.execute("DROP TABLE IF EXISTS `{0}`.`step_activity`;".format(benchmark_db_name))
+cursor.execute("USE `{0}`;".format(benchmark_db_name))
+cursor.execute(config.get("sql_script", "step_activity"))
+db.commit()
+
+filepath = os.path.join(os.getcwd(), "benchmark-{0}_step-activity.csv".format(row_count))
+if not os.path.isfile(filepath):
+    logger.info("Writing {0} rows to {1}...".format(row_count, filepath))
+    write_step_activity_file(filepath, row_count)
+
+pool = ConnectionPool(db_host, db_user, db_pass, 1, local_infile=1)
+for name, loader in [('pandas', PandasLoader(pool, config.getint("general", "csv_chunk_size"))), ('load_data', LoadDataLoader(pool))]:
+    cursor.execute("TRUNCATE TABLE `step_activity`;")
+    db.commit()
+    start_time = time.time()
+    loader.load(filepath, benchmark_db_name, 'step_activity', types, datetime_columns)
+    seconds = time.time() - start_time
+    cursor.execute("SELECT COUNT(*) FROM `step_activity`;")
+    loaded = cursor.fetchone()[0]
+    logger.info("{0}: loaded {1} rows in {2:.1f} seconds ({3:.0f} rows/s)".format(name, loaded, seconds, loaded / seconds))
+
+cursor.close()
+db.close()
+pool.close()
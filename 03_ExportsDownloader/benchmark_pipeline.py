@@ -0,0 +1,213 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+
+# ---------------------------------------------------------------------------------
+#
+# Benchmark of the download and load of main.py, against the local FutureLearn stand-in of futurelearn_standin.py.
+# Each scenario of [benchmark] pipeline_rows is a course, benchmark-<rows> version 1, whose exports have that many
+# rows in total. The course is registered in futurelearn_courses_information for the time of the benchmark, and
+# main.py downloads and loads it into the benchmark-<rows>-1 database, in its own Python process:
+#   python benchmark_pipeline.py                     runs all the scenarios
+#   python benchmark_pipeline.py <config file>       runs main.py with the config file of a scenario
+#
+# ---------------------------------------------------------------------------------
+import ConfigParser
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+import MySQLdb
+from futurelearn_standin import FutureLearnStandIn, export_file_name, write_export
+from schema_registry import SchemaRegistry
+
+# The share of the rows of a scenario in each export, step_activity is by far the biggest export of a course.
+EXPORT_SHARES = [('step_activity', 0.6), ('comments', 0.15), ('question_response', 0.15), ('enrolments', 0.05),
+                 ('peer_review_assignments', 0.025), ('peer_review_reviews', 0.025)]
+USERNAME = 'benchmark@futurelearn.local'
+PASSWORD = 'benchmark'
+
+
+def run_scenario(config_file):
+    """
+        Download and load the course of a scenario with main.py, in this process.
+    :param config_file: The config file written by write_scenario_config.
+    :return: The seconds, rows, bytes and peak memory of the run, and its run report.
+    """
+    import main
+    main.cp = main.ConfigParameters(config_file)
+    start_time = time.time()
+    main.Run()
+    seconds = time.time() - start_time
+
+    summary = main.cp.metrics.summary()
+    stages = summary['stages']
+    rows = sum(stages.get(stage, {}).get('rows', 0) for stage in ('to_sql', 'load_data'))
+    byte_count = stages.get('write', {}).get('bytes', 0)
+    try:
+        import resource
+        # ru_maxrss is in kilobytes on Linux, and in bytes on macOS.
+        peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_memory = peak_memory if sys.platform == 'darwin' else peak_memory * 1024
+    except ImportError:
+        peak_memory = None
+    return {'seconds': seconds, 'rows': rows, 'bytes': byte_count, 'peak_memory': peak_memory, 'report': summary}
+
+
+def write_scenario_config(config, course_slug, standin_url, config_file):
+    """
+        Write the config of a scenario: the options of config.txt, pointed at the stand-in and the course of the scenario.
+    """
+    config.set("general", "futurelearn_url", standin_url)
+    config.set("general", "username", USERNAME)
+    config.set("general", "password", PASSWORD)
+    config.set("general", "wait_time_seconds", "0")
+    config.set("general", "place_files_in_data_directory", "benchmark_data")
+    config.set("general", "use_course_name_as_folder", "False")
+    config.set("general", "download_enable", "True")
+    config.set("general", "use_course_slugs", "True")
+    config.set("general", "course_slugs", "{0},1".format(course_slug))
+    # Every run downloads and loads the whole course.
+    config.set("general", "conditional_download", "False")
+    config.set("general", "delta_load_exports", "")
+    config.set("general", "run_report_folder", "")
+    config.set("rscript", "preprocessing_enable", "False")
+    with open(config_file, 'w') as f:
+        config.write(f)
+
+
+def register_course(db, course_slug, file_ids):
+    """
+        Add the course of a scenario and its exports to course_information and course_file_information.
+    """
+    cursor = db.cursor()
+    cursor.callproc('insert_course_information', [course_slug, course_slug, 6, '2017-02-20', '2017-01-09', 1, 0, 'FINISHED', 'benchmark'])
+    cursor.close()
+    cursor = db.cursor()
+    cursor.callproc('find_course_id', [course_slug, 1])
+    course_id = cursor.fetchone()[0]
+    cursor.close()
+    for export, share in EXPORT_SHARES:
+        cursor = db.cursor()
+        cursor.callproc('insert_course_file_information', [course_id, file_ids[export]])
+        cursor.close()
+    db.commit()
+    return course_id
+
+
+def unregister_course(db, course_slug, course_id):
+    """
+        Remove the course of a scenario, with the rows its run logged against it.
+    """
+    cursor = db.cursor()
+    for table in ('course_logging_table', 'course_file_fingerprint'):
+        cursor.execute("DELETE FROM {0} WHERE course_file_id IN "
+                       "(SELECT id FROM course_file_information WHERE course_id = %s);".format(table), [course_id])
+    cursor.execute("DELETE FROM course_vis_table_fingerprint WHERE course_id = %s;", [course_id])
+    cursor.execute("DELETE FROM course_file_stage_duration WHERE course_name_fl = %s AND version = 1;", [course_slug])
+    cursor.execute("DELETE FROM course_file_information WHERE course_id = %s;", [course_id])
+    cursor.execute("DELETE FROM course_information WHERE id = %s;", [course_id])
+    db.commit()
+    cursor.close()
+
+
+logger = logging.getLogger('futurelearn_pipeline_benchmark')
+logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %I:%M:%S %p')
+logger.setLevel(logging.INFO)
+
+if len(sys.argv) > 1:
+    # The result is the last line of the output, main.py logs to stderr.
+    print json.dumps(run_scenario(sys.argv[1]))
+    sys.exit(0)
+
+config = ConfigParser.ConfigParser(allow_no_value=True)
+config.read('config.txt')
+db_host = config.get("database", "db_host")
+db_name = config.get("database", "db_name")
+db_user = config.get("database", "db_user")
+db_pass = config.get("database", "db_pass")
+scenarios = [int(x) for x in config.get("benchmark", "pipeline_rows").split(",") if x.strip()]
+port = config.getint("benchmark", "pipeline_port")
+
+db = MySQLdb.connect(host=db_host, user=db_user, passwd=db_pass, db=db_name, charset='utf8', use_unicode=True)
+schema = SchemaRegistry(db)
+cursor = db.cursor()
+cursor.callproc('get_file_information')
+file_ids = dict((row[1], row[0]) for row in cursor.fetchall())
+cursor.close()
+
+# The exports are written once, and kept for the next benchmarks.
+export_folder = os.path.join(os.getcwd(), "benchmark_exports")
+if not os.path.exists(export_folder):
+    os.makedirs(export_folder)
+for row_count in scenarios:
+    for export, share in EXPORT_SHARES:
+        filepath = os.path.join(export_folder, export_file_name("benchmark-{0}".format(row_count), 1, export))
+        if not os.path.isfile(filepath):
+            logger.info("Writing {0} rows to {1}...".format(int(row_count * share), filepath))
+            write_export(filepath, schema.get(export).column_types, int(row_count * share))
+
+standin = FutureLearnStandIn(port, export_folder, USERNAME, PASSWORD)
+standin.start()
+results = []
+try:
+    for row_count in scenarios:
+        course_slug = "benchmark-{0}".format(row_count)
+        course_id = register_course(db, course_slug, file_ids)
+        try:
+            # Start from an empty database, so every export is created and fully loaded.
+            cursor = db.cursor()
+            cursor.execute("DROP DATABASE IF EXISTS `{0}-1`;".format(course_slug))
+            cursor.close()
+
+            config_file = os.path.join(os.getcwd(), "{0}-config.txt".format(course_slug))
+            write_scenario_config(config, course_slug, standin.url, config_file)
+            logger.info("Running {0}...".format(course_slug))
+            output = subprocess.check_output([sys.executable, os.path.abspath(__file__), config_file])
+            result = json.loads(output.strip().splitlines()[-1])
+            result['scenario'] = row_count
+            results.append(result)
+            logger.info("{0}: loaded {1} rows ({2:.1f} MB) in {3:.1f} seconds, {4:.0f} rows/s, {5:.2f} MB/s, peak memory {6}".format(
+                course_slug, result['rows'], result['bytes'] / 1e6, result['seconds'], result['rows'] / result['seconds'],
+                result['bytes'] / 1e6 / result['seconds'],
+                "{0:.0f} MB".format(result['peak_memory'] / 1e6) if result['peak_memory'] else "unknown"))
+        finally:
+            try:
+                unregister_course(db, course_slug, course_id)
+            except MySQLdb.Error, e:
+                db.rollback()
+                logger.error("Could not remove the {0} course from the database: {1}".format(course_slug, e))
+finally:
+    standin.stop()
+    db.close()
+
+report_folder = os.path.join(os.getcwd(), "benchmark_reports")
+if not os.path.exists(report_folder):
+    os.makedirs(report_folder)
+report_path = os.path.join(report_folder, "pipeline-{0}.json".format(datetime.now().strftime('%Y%m%d-%H%M%S')))
+with open(report_path, 'w') as f:
+    json.dump(results, f, indent=2, sort_keys=True)
+logger.info("Benchmark report: {0}".format(report_path))
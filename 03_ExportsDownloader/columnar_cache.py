@@ -0,0 +1,232 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+
+# ---------------------------------------------------------------------------------
+#
+# A columnar copy of the exports, next to the tables of the <course_slug>-<version> databases:
+# one Parquet or Feather file per (course, version, export), typed with the column types of the export
+# (see schema_registry.py). Analyses that read the same exports again can load only the columns and rows
+# they need from the file instead of querying MySQL.
+#   parquet: compressed, written chunk_size rows at a time, so the memory used does not grow with the export.
+#   feather: uncompressed and the fastest to read, the whole export is converted in memory before it is written.
+# pyarrow is optional, the cache is only available when it is installed. Only the calls of pyarrow 0.16
+# (the last release for Python 2) are used.
+#
+# ---------------------------------------------------------------------------------
+import os
+import tempfile
+import pandas as pd
+from export_fetcher import replace_file
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+FORMATS = {'parquet': '.parquet', 'feather': '.feather'}
+
+# The filter operators of ColumnarCache.read, as in pyarrow's filters.
+FILTER_OPERATORS = {
+    '==': lambda column, value: column == value,
+    '=': lambda column, value: column == value,
+    '!=': lambda column, value: column != value,
+    '<': lambda column, value: column < value,
+    '<=': lambda column, value: column <= value,
+    '>': lambda column, value: column > value,
+    '>=': lambda column, value: column >= value,
+    'in': lambda column, value: column.isin(value),
+    'not in': lambda column, value: ~column.isin(value),
+}
+
+
+def is_available():
+    """
+        :return: True if pyarrow is installed.
+    """
+    return pa is not None
+
+
+def arrow_type(column_type):
+    """
+        The pyarrow type of a column, from its MySQL type in column_information.
+    :param column_type: The MySQL type (e.g. varchar(255), tinyint(1), datetime).
+    :return: A pyarrow DataType, string for the types that are not numbers, booleans or dates.
+    """
+    column_type = (column_type or '').lower()
+    if column_type == 'datetime':
+        return pa.timestamp('us')
+    if 'tinyint' in column_type:
+        return pa.bool_()
+    if 'int' in column_type:
+        return pa.int64()
+    if 'float' in column_type or 'double' in column_type or 'decimal' in column_type:
+        return pa.float64()
+    return pa.string()
+
+
+def convert_column(values, data_type):
+    """
+        Convert a column read as text by pandas to the values of its pyarrow type, the empty values become null.
+    :param values: A pandas Series of strings (NaN for the empty values).
+    :param data_type: The pyarrow type of the column.
+    :return: A pandas Series.
+    """
+    if data_type == pa.timestamp('us'):
+        return pd.to_datetime(values.str.replace(' UTC', ''), errors='coerce')
+    if data_type == pa.bool_():
+        return values.str.lower().map({'true': True, 'false': False, '1': True, '0': False})
+    if data_type == pa.int64() or data_type == pa.float64():
+        return pd.to_numeric(values, errors='coerce')
+    return values
+
+
+class ColumnarCache:
+    def __init__(self, folder, file_format='parquet', chunk_size=100000):
+        """Write and read the columnar copies of the exports.
+
+            :param:
+                folder: The folder of the cache, with a <course_slug>-<version> folder per course
+                file_format: 'parquet' or 'feather'
+                chunk_size: The number of rows of the csv file converted at a time
+        """
+        if file_format not in FORMATS:
+            raise ValueError("Unknown columnar cache format '{0}', use 'parquet' or 'feather'.".format(file_format))
+        if not is_available():
+            raise ImportError("The columnar cache needs pyarrow, install it with 'pip install pyarrow'.")
+        self.folder = folder
+        self.file_format = file_format
+        self.chunk_size = chunk_size
+
+    def path(self, course_slug, version, file_name):
+        """
+            The path of the columnar copy of an export.
+        :param course_slug: The course slug (e.g. remaking-nature).
+        :param version: The run of the course.
+        :param file_name: The name of the export (e.g. step_activity).
+        :return: <folder>/<course_slug>-<version>/<file_name>.parquet (or .feather)
+        """
+        return os.path.join(self.folder, "{0}-{1}".format(course_slug, version), file_name + FORMATS[self.file_format])
+
+    def exists(self, course_slug, version, file_name):
+        return os.path.isfile(self.path(course_slug, version, file_name))
+
+    def write(self, csv_path, course_slug, version, file_name, column_types):
+        """
+            Convert a downloaded export to its columnar copy. The copy is written to a temporary file
+            that is renamed on completion, so a reader sees either the previous copy or the complete new one.
+        :param csv_path: The path to the csv file.
+        :param course_slug: The course slug.
+        :param version: The run of the course.
+        :param file_name: The name of the export.
+        :param column_types: A dictionary of column name to MySQL type (FileSchema.column_types),
+                             the columns that are not in it are kept as strings.
+        :return: The number of rows written.
+        """
+        target_path = self.path(course_slug, version, file_name)
+        folder = os.path.dirname(target_path)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(target_path) + '.', suffix='.part', dir=folder)
+        os.close(fd)
+
+        row_count = 0
+        schema = None
+        writer = None
+        tables = []
+        try:
+            # Every column is read as text and converted here, so all the chunks have the same schema.
+            for df in pd.read_csv(csv_path, dtype=str, sep=',', chunksize=self.chunk_size):
+                if schema is None:
+                    schema = pa.schema([pa.field(column, arrow_type(column_types.get(column))) for column in df.columns])
+                for field in schema:
+                    df[field.name] = convert_column(df[field.name], field.type)
+                table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+                row_count += len(df.index)
+                if self.file_format == 'parquet':
+                    if writer is None:
+                        writer = pq.ParquetWriter(temp_path, schema)
+                    writer.write_table(table)
+                else:
+                    tables.append(table)
+
+            if self.file_format == 'parquet':
+                if writer is None:
+                    # The export only has a header, or nothing at all.
+                    writer = pq.ParquetWriter(temp_path, schema or pa.schema([]))
+                writer.close()
+                writer = None
+            else:
+                # write_feather of pyarrow 0.16 takes a DataFrame, not a Table.
+                if tables:
+                    df = pa.concat_tables(tables).to_pandas()
+                else:
+                    df = pd.DataFrame(columns=[field.name for field in schema] if schema is not None else [])
+                feather.write_feather(df, temp_path)
+            replace_file(temp_path, target_path)
+        except:
+            if writer is not None:
+                writer.close()
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return row_count
+
+    def read(self, course_slug, version, file_name, columns=None, filters=None):
+        """
+            Read the columnar copy of an export, the parquet files are memory-mapped.
+        :param course_slug: The course slug.
+        :param version: The run of the course.
+        :param file_name: The name of the export.
+        :param columns: The columns to read, all of them if None.
+        :param filters: The rows to keep, a list of (column, operator, value) conditions that all have to hold,
+                        the operators are ==, !=, <, <=, >, >=, in and not in (e.g. [('week_number', '==', 2)]).
+        :return: A pandas DataFrame.
+        """
+        filters = filters or []
+        for column, operator, value in filters:
+            if operator not in FILTER_OPERATORS:
+                raise ValueError("Unknown filter operator '{0}'.".format(operator))
+
+        # The filter columns are read as well, and dropped once the rows are selected.
+        read_columns = None
+        if columns is not None:
+            read_columns = list(columns) + [f[0] for f in filters if f[0] not in columns]
+
+        path = self.path(course_slug, version, file_name)
+        if self.file_format == 'parquet':
+            table = pq.read_table(path, columns=read_columns, memory_map=True)
+        else:
+            table = feather.read_table(path, columns=read_columns)
+        df = table.to_pandas()
+
+        if filters:
+            mask = pd.Series(True, index=df.index)
+            for column, operator, value in filters:
+                mask &= FILTER_OPERATORS[operator](df[column], value)
+            df = df[mask].reset_index(drop=True)
+        if columns is not None:
+            df = df[list(columns)]
+        return df
@@ -0,0 +1,106 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+# ---------------------------------------------------------------------------------
+#
+# The courses processed by a run, keyed by (course_slug, version), with the export files of each course
+# and what happened to them during the run (the files that failed and the files loaded with new content).
+#
+# ---------------------------------------------------------------------------------
+from collections import OrderedDict
+
+
+class Course:
+    def __init__(self, slug, version):
+        """A run of a course and its export files.
+
+            :param:
+                slug: The course slug from the FutureLearn website (e.g. remaking-nature)
+                version: The run of the course (e.g. 1, 2, etc)
+        """
+        self.slug = slug
+        self.version = str(version)
+        self.db_name = slug + '-' + self.version
+        self.organisation = None
+        self.files = []
+        # The files that could not be fetched or loaded in this run, their visualisation tables are not updated.
+        self.error_files = []
+        # The files loaded with new content in this run.
+        self.changed_files = []
+        # The (vis_table_name, file_name) rows of get_vis_tables_by_course, set when the run preprocesses the course.
+        self.vis_tables = []
+        # The files the visualisation tables need that are not loaded yet, and whether the Rscript has been started.
+        self.pending_files = set()
+        self.preprocessing_started = False
+        # The visualisation tables passed to the Rscript, with the fingerprint of the files they are built from.
+        self.vis_table_builds = {}
+
+    def add_error_file(self, file_name):
+        if file_name not in self.error_files:
+            self.error_files.append(file_name)
+
+    def set_vis_tables(self, vis_tables):
+        self.vis_tables = list(vis_tables)
+        self.pending_files = set(row[1] for row in self.vis_tables if row[1] in self.files)
+
+
+class CourseCatalogue:
+    def __init__(self, active_courses, course_file_names):
+        """Index the active courses and their files.
+
+            :param:
+                active_courses: The [course_slug, version, ...] rows of the courses to process
+                course_file_names: The (course_slug, version, file_name, organisation) rows of get_active_course_file_names,
+                                   the rows of the courses that are not active are ignored
+        """
+        self.courses = OrderedDict()
+        for row in active_courses:
+            key = (row[0], str(row[1]))
+            if key not in self.courses:
+                self.courses[key] = Course(row[0], row[1])
+
+        for row in course_file_names:
+            course = self.courses.get((row[0], str(row[1])))
+            if course is not None:
+                course.files.append(row[2])
+                course.organisation = row[3]
+
+    def get(self, slug, version):
+        """
+            Find a course by its slug and version.
+        :return: The Course, or None if it is not in the catalogue.
+        """
+        return self.courses.get((slug, str(version)))
+
+    def __iter__(self):
+        return iter(self.courses.values())
+
+    def __len__(self):
+        return len(self.courses)
+
+    def course_files(self):
+        """
+            List the files of all courses, in the order of the courses.
+        :return: A list of (course_slug, version, file_name) tuples.
+        """
+        return [(course.slug, course.version, file_name) for course in self for file_name in course.files]
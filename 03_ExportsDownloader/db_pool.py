@@ -0,0 +1,202 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+
+# ---------------------------------------------------------------------------------
+#
+# A pool of MySQL connections to the <course_slug>-<version> databases, shared by the whole run.
+# At most `size` connections are open at a time. An idle connection is reused by the next
+# request for the same database, or closed to make room for a connection to another one.
+# The SQLAlchemy engines used by pandas are kept per database and take their connections from the pool.
+#
+# ---------------------------------------------------------------------------------
+import threading
+import time
+from contextlib import contextmanager
+import MySQLdb
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+
+class PooledConnection(object):
+    def __init__(self, pool, db_name, connection):
+        """A MySQLdb connection that goes back to the pool when it is closed."""
+        self._pool = pool
+        self._db_name = db_name
+        self._connection = connection
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def close(self):
+        if self._connection is not None:
+            self._pool.release(self._db_name, self._connection)
+            self._connection = None
+
+
+class ConnectionPool:
+    def __init__(self, db_host, db_user, db_pass, size, **connect_args):
+        """Share a bounded number of connections between the databases of the run.
+
+            :param:
+                db_host: The database host
+                db_user: The database user
+                db_pass: The user's password
+                size: The maximum number of open connections
+                connect_args: More arguments for MySQLdb.connect (e.g. local_infile=1)
+        """
+        self.db_host = db_host
+        self.db_user = db_user
+        self.db_pass = db_pass
+        self.size = size
+        self.connect_args = connect_args
+        self.condition = threading.Condition()
+        self.open_count = 0
+        # The idle connections as (database, connection), the most recently used last.
+        self.idle = []
+        self.engines = {}
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def acquire(self, db_name):
+        """
+            Take a connection to a database, waiting for one to be released if the pool is full.
+        :param db_name: The database to connect to.
+        :return: A MySQLdb connection, to be given back with release.
+        """
+        wait_start = None
+        with self.condition:
+            while True:
+                connection = self.take_idle(db_name)
+                if connection is not None:
+                    self.hits += 1
+                    break
+                if self.open_count < self.size:
+                    self.open_count += 1
+                    self.misses += 1
+                    break
+                if self.idle:
+                    # Make room by closing the connection that has been idle the longest.
+                    self.idle.pop(0)[1].close()
+                    self.open_count -= 1
+                    continue
+                if wait_start is None:
+                    wait_start = time.time()
+                    self.waits += 1
+                self.condition.wait()
+            if wait_start is not None:
+                self.wait_seconds += time.time() - wait_start
+
+        if connection is None:
+            try:
+                connection = MySQLdb.connect(host=self.db_host, user=self.db_user, passwd=self.db_pass, db=db_name,
+                                             charset='utf8', use_unicode=True, **self.connect_args)
+            except:
+                self.discard(None)
+                raise
+        return connection
+
+    def take_idle(self, db_name):
+        # The caller holds the lock. A connection dropped by the server while idle is closed and skipped.
+        for i in range(len(self.idle) - 1, -1, -1):
+            if self.idle[i][0] == db_name:
+                connection = self.idle.pop(i)[1]
+                try:
+                    connection.ping()
+                    return connection
+                except MySQLdb.Error:
+                    connection.close()
+                    self.open_count -= 1
+        return None
+
+    def release(self, db_name, connection):
+        """
+            Give a connection back to the pool, any transaction left open is rolled back.
+        """
+        try:
+            connection.rollback()
+        except MySQLdb.Error:
+            self.discard(connection)
+            return
+        with self.condition:
+            self.idle.append((db_name, connection))
+            self.condition.notify()
+
+    def discard(self, connection):
+        """
+            Close a connection that cannot be used any more, and free its place in the pool.
+        """
+        if connection is not None:
+            try:
+                connection.close()
+            except MySQLdb.Error:
+                pass
+        with self.condition:
+            self.open_count -= 1
+            self.condition.notify()
+
+    @contextmanager
+    def connection(self, db_name):
+        """
+            Use a connection of the pool in a with statement, it is discarded if the block raises a MySQL error.
+        """
+        connection = self.acquire(db_name)
+        try:
+            yield connection
+        except MySQLdb.OperationalError:
+            self.discard(connection)
+            raise
+        except:
+            self.release(db_name, connection)
+            raise
+        self.release(db_name, connection)
+
+    def engine(self, db_name):
+        """
+            The SQLAlchemy engine of a database, for pandas. It does not keep connections of its own.
+        """
+        with self.condition:
+            if db_name not in self.engines:
+                self.engines[db_name] = create_engine('mysql+mysqldb://', poolclass=NullPool,
+                                                      creator=lambda: PooledConnection(self, db_name, self.acquire(db_name)))
+            return self.engines[db_name]
+
+    def stats(self):
+        """
+            :return: A dictionary of the number of connections reused (hits), opened (misses),
+                     the number of times the pool was full (waits) and the time spent waiting.
+        """
+        with self.condition:
+            return {'hits': self.hits, 'misses': self.misses, 'waits': self.waits, 'wait_seconds': self.wait_seconds}
+
+    def close(self):
+        """
+            Close the idle connections.
+        """
+        with self.condition:
+            for db_name, connection in self.idle:
+                connection.close()
+            self.open_count -= len(self.idle)
+            self.idle = []
@@ -0,0 +1,78 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+
+# ---------------------------------------------------------------------------------
+#
+# Read the result of a query or a stored procedure with a server-side (unbuffered) cursor,
+# fetch_size rows at a time, so a big result is never held in memory as a whole.
+# The connection cannot run another query until all the rows have been read or the generator is closed.
+# DBConnection.streamQuery and streamProcedure in 02_CorseStepInfoDownloader/db_queries.py do the same,
+# each folder runs on its own so it keeps its own copy: a change to one should be made to the other.
+#
+# ---------------------------------------------------------------------------------
+import MySQLdb.cursors
+
+
+def iter_rows(cursor, fetch_size):
+    """
+        Yield the rows of an executed cursor, fetch_size at a time, and close the cursor.
+        Closing it reads what is left of the result, and the status result of a stored procedure.
+    """
+    try:
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row
+    finally:
+        cursor.close()
+
+
+def stream_query(db, query, args=None, fetch_size=1000):
+    """
+        Run a query and yield its rows.
+    :param db: A MySQLdb connection.
+    :param query: The SQL query.
+    :param args: The arguments of the query.
+    :param fetch_size: The number of rows read from the server at a time.
+    :return: A generator of the rows.
+    """
+    cursor = db.cursor(MySQLdb.cursors.SSCursor)
+    cursor.execute(query, args)
+    return iter_rows(cursor, fetch_size)
+
+
+def stream_procedure(db, procname, args=(), fetch_size=1000):
+    """
+        Call a stored procedure and yield the rows of its result.
+    :param db: A MySQLdb connection.
+    :param procname: The name of the stored procedure.
+    :param args: The arguments of the stored procedure.
+    :param fetch_size: The number of rows read from the server at a time.
+    :return: A generator of the rows.
+    """
+    cursor = db.cursor(MySQLdb.cursors.SSCursor)
+    cursor.callproc(procname, args)
+    return iter_rows(cursor, fetch_size)
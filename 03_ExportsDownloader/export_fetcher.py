@@ -0,0 +1,114 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+# ---------------------------------------------------------------------------------
+#
+# Helpers used by the download workers to fetch the FutureLearn exports.
+# Nothing in here touches the database, so it is safe to use from several threads.
+# RateLimiter is the same as the one of 02_CorseStepInfoDownloader/page_fetcher.py, each folder runs on its own
+# so it keeps its own copy: a change to one should be made to the other.
+#
+# ---------------------------------------------------------------------------------
+import os
+import tempfile
+import threading
+import time
+from urlparse import urlparse
+
+
+class RateLimiter:
+    def __init__(self, requests_per_second):
+        """Space out the requests sent to the same host, shared by all download workers.
+
+            :param:
+                requests_per_second: The maximum number of requests per second for each host,
+                                     0 (or less) disables the limit.
+        """
+        if requests_per_second > 0:
+            self.min_interval = 1.0 / requests_per_second
+        else:
+            self.min_interval = 0
+        self.next_request_time = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        """
+            Block the calling thread until a request to the host of the given url is allowed.
+        :param url: The url that is going to be requested.
+        :return:
+        """
+        if self.min_interval == 0:
+            return
+
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.time()
+            request_time = max(now, self.next_request_time.get(host, now))
+            self.next_request_time[host] = request_time + self.min_interval
+
+        if request_time > now:
+            time.sleep(request_time - now)
+
+
+def replace_file(source_path, target_path):
+    """
+        Rename source_path to target_path, overwriting target_path if it exists.
+        The rename is atomic on POSIX, Windows refuses to rename over an existing file so it is removed first.
+    :param source_path: The file to be renamed.
+    :param target_path: The final name of the file.
+    :return:
+    """
+    if os.name == 'nt' and os.path.exists(target_path):
+        os.remove(target_path)
+    os.rename(source_path, target_path)
+
+
+def stream_to_file(response, filepath, chunk_size, content_hash=None):
+    """
+        Write the body of a response requested with stream=True to filepath, one chunk at a time,
+        so the memory used does not depend on the size of the file.
+        The chunks go to a temporary file next to filepath which is renamed on completion,
+        so filepath is either the previous file or the complete new one.
+    :param response: The response object returned by session.get(url, stream=True).
+    :param filepath: Where the file has to be written to.
+    :param chunk_size: The number of bytes read from the network at a time.
+    :param content_hash: An optional hashlib object, updated with every chunk written.
+    :return: The number of bytes written.
+    """
+    folder, filename = os.path.split(filepath)
+    fd, temp_path = tempfile.mkstemp(prefix=filename + '.', suffix='.part', dir=folder or '.')
+    size = 0
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    f.write(chunk)
+                    size += len(chunk)
+                    if content_hash is not None:
+                        content_hash.update(chunk)
+        replace_file(temp_path, filepath)
+    except:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return size
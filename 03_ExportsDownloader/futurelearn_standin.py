@@ -0,0 +1,257 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+
+# ---------------------------------------------------------------------------------
+#
+# A local stand-in for the parts of the FutureLearn website used by main.py, for the benchmarks:
+#   /sign-in                                            the sign-in form, and its POST setting the session cookie
+#   /admin/courses/<slug>/<version>/stats-dashboard     the list of the exports of a course run
+#   /admin/courses/<slug>/<version>/stats-dashboard/data/<export>
+#                                                       the <slug>-<version>_<export>.csv file of the export folder,
+#                                                       with an ETag and Last-Modified, 304 for a conditional request
+# The synthetic exports are written by write_export, from the column types of the file.
+#
+# ---------------------------------------------------------------------------------
+import BaseHTTPServer
+import Cookie
+import csv
+import os
+import random
+import re
+import threading
+import uuid
+from datetime import datetime, timedelta
+from email.utils import formatdate
+from SocketServer import ThreadingMixIn
+from urlparse import parse_qs
+
+EXPORT_URL = re.compile(r"^/admin/courses/([^/]+)/(\d+)/stats-dashboard(?:/data/(\w+))?$")
+SESSION_COOKIE = '_futurelearn_session'
+
+
+def export_file_name(course_slug, version, export):
+    return "{0}-{1}_{2}.csv".format(course_slug, version, export)
+
+
+def write_export(filepath, column_types, row_count, seed=0):
+    """
+        Write a synthetic export with row_count rows, in the FutureLearn format.
+        The values only follow the MySQL type of each column: uuids for varchar(36), quoted text with commas
+        and new lines for text, 'true'/'false' for tinyint and datetimes with a ' UTC' suffix.
+    :param filepath: Where the file is written to.
+    :param column_types: A dictionary of column name to MySQL type, the FileSchema.column_types of the export.
+    :param row_count: The number of rows of the file.
+    :param seed: The seed of the random values, the same file is written for the same seed.
+    :return:
+    """
+    random.seed(seed)
+    columns = sorted(column_types)
+    start = datetime(2017, 1, 9)
+    words = ['learner', 'step', 'week', 'course', 'video', 'quiz', 'comment', 'review', 'data', 'MOOC']
+
+    def value(column, column_type, i):
+        if column_type == 'varchar(36)':
+            return "{0:08x}-0000-4000-8000-{1:012x}".format(random.randint(0, 99999), i)
+        if column == 'step':
+            return "{0}.{1}".format(random.randint(1, 6), random.randint(1, 20))
+        if column_type.startswith('varchar'):
+            size = int(re.search(r"\d+", column_type).group(0))
+            return random.choice(words)[:size]
+        if column_type == 'text':
+            return '{0}, "{1}"\n{2}'.format(*random.sample(words, 3))
+        if column_type.startswith('tinyint'):
+            return random.choice(['true', 'false'])
+        if column_type == 'datetime':
+            if random.random() < 0.1:
+                return ''
+            return (start + timedelta(seconds=random.randint(0, 6 * 7 * 24 * 3600))).strftime('%Y-%m-%d %H:%M:%S UTC')
+        if column_type == 'date':
+            return (start + timedelta(days=random.randint(0, 6 * 7))).strftime('%Y-%m-%d')
+        if column_type.startswith(('double', 'float', 'decimal')):
+            return "{0:.2f}".format(random.random() * 100)
+        if 'int' in column_type:
+            if column in ('id', 'assignment_id', 'review_id'):
+                return str(i + 1)
+            return str(random.randint(1, 20))
+        return ''
+
+    with open(filepath, 'wb') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(columns)
+        for i in range(row_count):
+            writer.writerow([value(column, column_types[column], i) for column in columns])
+
+
+class StandInHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        # The requests are logged by main.py, the stand-in stays quiet.
+        pass
+
+    def send_body(self, status, body, content_type='text/html; charset=utf-8', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def is_signed_in(self):
+        cookie = Cookie.SimpleCookie(self.headers.get('Cookie', ''))
+        return SESSION_COOKIE in cookie and self.server.has_session(cookie[SESSION_COOKIE].value)
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/sign-in':
+            self.send_body(200, self.server.sign_in_form())
+            return
+
+        match = EXPORT_URL.match(path)
+        if match is None:
+            self.send_body(404, "Not found")
+            return
+        if not self.is_signed_in():
+            self.send_body(302, "", headers={'Location': '/sign-in'})
+            return
+
+        course_slug, version, export = match.groups()
+        if export is None:
+            self.send_body(200, self.server.stats_dashboard(course_slug, version))
+        else:
+            self.send_export(os.path.join(self.server.export_folder, export_file_name(course_slug, version, export)))
+
+    def do_POST(self):
+        if self.path != '/sign-in':
+            self.send_body(404, "Not found")
+            return
+
+        form = parse_qs(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        session = self.server.sign_in(form.get('authenticity_token', [''])[0], form.get('email', [''])[0],
+                                      form.get('password', [''])[0])
+        if session is None:
+            self.send_body(401, self.server.sign_in_form())
+        else:
+            self.send_body(200, "<html><body>Signed in</body></html>",
+                           headers={'Set-Cookie': "{0}={1}; path=/".format(SESSION_COOKIE, session)})
+
+    def send_export(self, filepath):
+        if not os.path.isfile(filepath):
+            self.send_body(404, "Not found")
+            return
+
+        stat = os.stat(filepath)
+        etag = '"{0:x}-{1:x}"'.format(stat.st_size, int(stat.st_mtime))
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        if self.headers.get('If-None-Match') == etag:
+            self.send_body(304, "", headers={'ETag': etag, 'Last-Modified': last_modified})
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('Content-Length', str(stat.st_size))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.end_headers()
+        with open(filepath, 'rb') as f:
+            while True:
+                chunk = f.read(self.server.chunk_size)
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+
+
+class FutureLearnStandIn(ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port, export_folder, username, password, chunk_size=65536):
+        """Serve the sign-in form and the exports of the export folder on http://127.0.0.1:<port>.
+
+            :param:
+                port: The port to listen on
+                export_folder: The folder of the <course_slug>-<version>_<export>.csv files
+                username, password: The credentials accepted by the sign-in form
+                chunk_size: The number of bytes of an export sent at a time
+        """
+        BaseHTTPServer.HTTPServer.__init__(self, ('127.0.0.1', port), StandInHandler)
+        self.export_folder = export_folder
+        self.username = username
+        self.password = password
+        self.chunk_size = chunk_size
+        self.authenticity_token = uuid.uuid4().hex
+        self.sessions = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{0}".format(self.server_address[1])
+
+    def sign_in_form(self):
+        return ('<html><body><form action="/sign-in" method="post">'
+                '<input type="hidden" name="utf8" value="&#x2713;">'
+                '<input type="hidden" name="authenticity_token" value="{0}">'
+                '<input type="email" name="email"><input type="password" name="password">'
+                '<input type="submit" value="Sign in"></form></body></html>').format(self.authenticity_token)
+
+    def sign_in(self, authenticity_token, email, password):
+        """
+            Check the form posted to /sign-in.
+        :return: A new session id, None if the form is wrong.
+        """
+        if authenticity_token != self.authenticity_token or email != self.username or password != self.password:
+            return None
+        session = uuid.uuid4().hex
+        with self.lock:
+            self.sessions.add(session)
+        return session
+
+    def has_session(self, session):
+        with self.lock:
+            return session in self.sessions
+
+    def stats_dashboard(self, course_slug, version):
+        prefix = "{0}-{1}_".format(course_slug, version)
+        links = []
+        for filename in sorted(os.listdir(self.export_folder)):
+            if filename.startswith(prefix) and filename.endswith('.csv'):
+                links.append('<li><a href="/admin/courses/{0}/{1}/stats-dashboard/data/{2}">{2}</a></li>'.format(
+                    course_slug, version, filename[len(prefix):-len('.csv')]))
+        return "<html><body><ul>{0}</ul></body></html>".format("".join(links))
+
+    def start(self):
+        """
+            Serve the requests from a background thread.
+        """
+        self.thread = threading.Thread(target=self.serve_forever, name='futurelearn-standin')
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self.thread is not None:
+            self.thread.join()
@@ -0,0 +1,185 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+# ---------------------------------------------------------------------------------
+#
+# The backends loading a downloaded csv file into its table in the <course_slug>-<version> database.
+#   pandas:    pandas.read_csv and DataFrame.to_sql, works for any file. The file is read and written
+#              chunk_size rows at a time, so the memory used does not grow with the size of the file.
+#   load_data: MySQL's LOAD DATA LOCAL INFILE, much faster for big files, used for full loads of files
+#              whose columns all exist in the table (otherwise the pandas backend is used).
+#
+# ---------------------------------------------------------------------------------
+import csv
+import time
+import pandas as pd
+
+
+def read_csv_header(filepath):
+    """
+        Read the column names from the first line of a csv file.
+    :param filepath: The path to the csv file.
+    :return: The list of column names.
+    """
+    with open(filepath, 'rb') as f:
+        return next(csv.reader(f))
+
+
+def get_table_columns(cursor, table_name):
+    """
+        Find the columns of a table.
+    :param cursor: A cursor on the database of the table.
+    :param table_name: The name of the table.
+    :return: The list of column names.
+    """
+    cursor.execute("SHOW COLUMNS FROM `{0}`;".format(table_name))
+    return [row[0] for row in cursor.fetchall()]
+
+
+class PandasLoader:
+    def __init__(self, pool, chunk_size):
+        """Load csv files with pandas.read_csv and DataFrame.to_sql.
+
+            :param:
+                pool: The ConnectionPool of the <course_slug>-<version> databases
+                chunk_size: The number of rows parsed and inserted at a time
+        """
+        self.pool = pool
+        self.chunk_size = chunk_size
+        # The seconds the last load spent in each of its stages.
+        self.timings = {}
+
+    def load(self, filepath, target_db_name, table_name, types, datetime_columns):
+        """
+            Append the rows of a csv file to a table.
+        :param filepath: The path to the csv file.
+        :param target_db_name: The <course_slug>-<version> database.
+        :param table_name: The table the rows are appended to.
+        :param types: A dictionary of column name to pandas type.
+        :param datetime_columns: The columns converted to datetime before loading.
+        :return: The number of rows in the csv file.
+        """
+        engine = self.pool.engine(target_db_name)
+
+        # Each chunk is written to the database before the next one is read.
+        # The index of the chunks carries on from one chunk to the next, i.e. it is the row number in the file.
+        row_count = 0
+        self.timings = {'read_csv': 0.0, 'to_datetime': 0.0, 'to_sql': 0.0}
+        start_time = time.time()
+        for df in pd.read_csv(filepath, dtype=types, sep=',', chunksize=self.chunk_size):
+            row_count += len(df.index)
+            start_time = self.add_timing('read_csv', start_time)
+
+            # Note from ajc: this is a workaround for 'datetime' items,
+            # which have been set to object earlier.
+            for datetime_column in datetime_columns:
+                if datetime_column in df.columns:
+                    df[datetime_column] = pd.to_datetime(df[datetime_column])
+            start_time = self.add_timing('to_datetime', start_time)
+
+            df.to_sql(con=engine, name=table_name, if_exists='append', flavor='mysql', chunksize=1000)
+            start_time = self.add_timing('to_sql', start_time)
+        self.add_timing('read_csv', start_time)
+        return row_count
+
+    def add_timing(self, stage, start_time):
+        now = time.time()
+        self.timings[stage] += now - start_time
+        return now
+
+
+class LoadDataLoader:
+    def __init__(self, pool):
+        """Load csv files with MySQL's LOAD DATA LOCAL INFILE.
+            The server has to allow it, and the connections of the pool have to be opened with local_infile=1.
+
+            :param:
+                pool: The ConnectionPool of the <course_slug>-<version> databases
+        """
+        self.pool = pool
+        # The seconds the last load spent in each of its stages, LOAD DATA parses and inserts in one statement.
+        self.timings = {}
+
+    def can_load(self, filepath, target_db_name, table_name):
+        """
+            Check every column of the csv file exists in the table.
+        :return: True if the file can be loaded with LOAD DATA.
+        """
+        with self.pool.connection(target_db_name) as db:
+            cursor = db.cursor()
+            table_columns = get_table_columns(cursor, table_name)
+            cursor.close()
+        return all(column in table_columns for column in read_csv_header(filepath))
+
+    def load(self, filepath, target_db_name, table_name, types, datetime_columns):
+        """
+            Load a whole csv file into an empty table. Takes the same arguments as PandasLoader.load.
+        :return: The number of rows loaded.
+        """
+        with open(filepath, 'rb') as f:
+            line_terminator = '\r\n' if f.readline().endswith('\r\n') else '\n'
+
+        # Each value is read into a user variable, then converted the way pandas would:
+        # empty values are NULL, datetime values lose their ' UTC' suffix and booleans become 0/1.
+        # The index column is the row number, as written by DataFrame.to_sql.
+        variables = []
+        assignments = ["`index` = (@row_number := @row_number + 1)"]
+        for i, column in enumerate(read_csv_header(filepath)):
+            variable = "@v{0}".format(i)
+            variables.append(variable)
+            if column in datetime_columns:
+                value = "NULLIF(TRIM(TRAILING ' UTC' FROM {0}), '')".format(variable)
+            elif types.get(column) is bool:
+                value = "CASE LOWER({0}) WHEN 'true' THEN 1 WHEN 'false' THEN 0 ELSE NULLIF({0}, '') END".format(variable)
+            else:
+                value = "NULLIF({0}, '')".format(variable)
+            assignments.append("`{0}` = {1}".format(column, value))
+
+        query = ("LOAD DATA LOCAL INFILE %s INTO TABLE `{0}` CHARACTER SET utf8 "
+                 "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+                 "LINES TERMINATED BY %s IGNORE 1 LINES ({1}) SET {2};").format(table_name, ", ".join(variables), ", ".join(assignments))
+
+        start_time = time.time()
+        with self.pool.connection(target_db_name) as db:
+            cursor = db.cursor()
+            cursor.execute("SET @row_number = -1;")
+            row_count = cursor.execute(query, [filepath, line_terminator])
+            db.commit()
+            cursor.close()
+        self.timings = {'load_data': time.time() - start_time}
+        return row_count
+
+
+def get_loader(backend, pool, chunk_size):
+    """
+        Create the loader for the loader_backend option of the config file.
+    :param backend: 'pandas' or 'load_data'
+    :param pool: The ConnectionPool of the <course_slug>-<version> databases.
+    :param chunk_size: The number of rows parsed at a time by the pandas loader.
+    :return: A PandasLoader or LoadDataLoader.
+    """
+    if backend == 'load_data':
+        return LoadDataLoader(pool)
+    if backend == 'pandas':
+        return PandasLoader(pool, chunk_size)
+    raise ValueError("Unknown loader_backend '{0}', use 'pandas' or 'load_data'.".format(backend))
@@ -0,0 +1,180 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+
+# ---------------------------------------------------------------------------------
+#
+# Writes the course log, the error log and the stage durations to the futurelearn_courses_information
+# database from a background thread, so the downloads and loads do not wait for a commit per message.
+# The messages are queued and written in batches of up to batch_size, at least every flush_seconds,
+# and whatever is still queued is written when the sink is closed (or the script exits).
+# A batch that fails is rolled back and written once more on a new connection, the messages of a batch that fails
+# twice are dropped and counted.
+#
+# ---------------------------------------------------------------------------------
+import atexit
+import logging
+import Queue
+import threading
+import MySQLdb
+
+
+class LoggingSink:
+    def __init__(self, db_host, db_name, db_user, db_pass, batch_size, flush_seconds):
+        """Queue log messages and write them in batches with a connection of its own.
+
+            :param:
+                db_host: The database host
+                db_name: The database name (futurelearn_courses_information)
+                db_user: The database user
+                db_pass: The user's password
+                batch_size: The maximum number of messages written in one transaction
+                flush_seconds: The longest time a message waits in the queue
+        """
+        self.db_host = db_host
+        self.db_name = db_name
+        self.db_user = db_user
+        self.db_pass = db_pass
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.logger = logging.getLogger('futurelearn_data_downloader')
+        self.queue = Queue.Queue()
+        self.closed = False
+        self.db = None
+        # The number of messages that could not be written.
+        self.dropped = 0
+        self.thread = threading.Thread(target=self.run, name='logging_sink')
+        self.thread.daemon = True
+        self.thread.start()
+        atexit.register(self.close)
+
+    def course_log(self, course_name, version, file_name, log_datetime, comment, vis_table_name=""):
+        """
+            Add a message to the course_logging_table, the ids are looked up by the merge_course_logging_staging store procedure.
+        """
+        # The comment column holds 500 characters, the store procedure used to cut the longer messages.
+        self.queue.put(('course', [course_name, version, file_name, log_datetime, comment[:500], vis_table_name]))
+
+    def error_log(self, error_datetime, error_message):
+        """
+            Add a message to the error_logging_table.
+        """
+        self.queue.put(('error', (error_message, error_datetime)))
+
+    def stage_duration(self, run_id, course_name, version, file_name, stage, started_datetime, duration_secs,
+                       byte_count=None, row_count=None):
+        """
+            Record how long a stage of a course file took in a run, and the bytes and rows it handled.
+        """
+        self.queue.put(('stage', (run_id, course_name, version, file_name, stage, started_datetime, duration_secs,
+                                  byte_count, row_count)))
+
+    def close(self):
+        """
+            Write everything still in the queue and stop the background thread. Called again at exit, it does nothing.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+
+    def run(self):
+        done = False
+        while not done:
+            # Wait for a first message, then take whatever else is queued, up to batch_size.
+            try:
+                batch = [self.queue.get(timeout=self.flush_seconds)]
+            except Queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except Queue.Empty:
+                    break
+            if None in batch:
+                done = True
+                batch = [message for message in batch if message is not None]
+            if batch:
+                self.write(batch)
+        if self.dropped > 0:
+            self.logger.error("{0} log messages could not be written to the database.".format(self.dropped))
+        if self.db is not None:
+            self.db.close()
+
+    def write(self, batch):
+        """
+            Write a batch of messages, rolled back and tried once more on a new connection if it fails.
+            The connection may have been closed by the server, and the temporary table goes with it.
+        """
+        for attempt in range(2):
+            try:
+                self.write_batch(batch)
+                return
+            except Exception, e:
+                self.logger.warn("Could not write {0} log messages to the database (attempt {1}): {2}".format(len(batch), attempt + 1, e))
+                self.reset()
+        self.dropped += len(batch)
+        self.logger.error("Dropped {0} log messages, {1} in total.".format(len(batch), self.dropped))
+
+    def reset(self):
+        # Roll back the failed batch and close the connection, the next batch opens a new one.
+        if self.db is not None:
+            try:
+                self.db.rollback()
+                self.db.close()
+            except MySQLdb.Error:
+                pass
+            self.db = None
+
+    def write_batch(self, batch):
+        # Each kind of message is inserted with one multi-row INSERT. The course messages go to a temporary table
+        # first, the merge_course_logging_staging store procedure then looks up the course, file and
+        # visualisation table ids of all of them in one INSERT ... SELECT.
+        if self.db is None:
+            self.db = MySQLdb.connect(host=self.db_host, user=self.db_user, passwd=self.db_pass, db=self.db_name,
+                                      charset='utf8', use_unicode=True)
+            cursor = self.db.cursor()
+            cursor.execute("CREATE TEMPORARY TABLE course_logging_staging (id int(11) NOT NULL AUTO_INCREMENT, "
+                           "course_name varchar(100), version int(11), file_name varchar(255), log_datetime datetime, "
+                           "comments varchar(500), vis_table_name varchar(100), PRIMARY KEY (id));")
+            cursor.close()
+        cursor = self.db.cursor()
+        courses = [args for kind, args in batch if kind == 'course']
+        if courses:
+            cursor.execute("DELETE FROM course_logging_staging;")
+            cursor.executemany("INSERT INTO course_logging_staging (course_name, version, file_name, log_datetime, comments, "
+                               "vis_table_name) VALUES (%s, %s, %s, %s, %s, %s)", courses)
+            cursor.callproc("merge_course_logging_staging")
+            cursor.close()
+            cursor = self.db.cursor()
+        errors = [args for kind, args in batch if kind == 'error']
+        if errors:
+            cursor.executemany("INSERT INTO error_logging_table (error_message, error_datetime) VALUES (%s, %s)", errors)
+        stages = [args for kind, args in batch if kind == 'stage']
+        if stages:
+            cursor.executemany("INSERT INTO course_file_stage_duration (run_id, course_name_fl, version, file_name, stage, "
+                               "started_datetime, duration_secs, byte_count, row_count) "
+                               "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)", stages)
+        self.db.commit()
+        cursor.close()
@@ -0,0 +1,118 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+
+# ---------------------------------------------------------------------------------
+#
+# The timings of a run. Each stage (login, download, write, fixups, read_csv, to_datetime, to_sql, merge,
+# rscript, ...) of a course file is recorded with its duration, and the bytes and rows it handled when known.
+# The records go to the course_file_stage_duration table with the id of the run, and at the end of the run
+# a summary per stage and per course is written to a JSON file, so runs can be compared over time.
+#
+# ---------------------------------------------------------------------------------
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class RunMetrics:
+    def __init__(self, sink):
+        """Record the stage durations of a run.
+
+            :param:
+                sink: The LoggingSink writing the records to the database
+        """
+        self.sink = sink
+        self.run_id = uuid.uuid4().hex
+        self.started_datetime = str(datetime.now())
+        self.start_time = time.time()
+        self.records = []
+        self.lock = threading.Lock()
+
+    def record(self, course_name, version, file_name, stage, started_datetime, duration_secs, byte_count=None, row_count=None):
+        """
+            Record a stage of a course file, course_name and version are None for the stages of the whole run
+            and file_name is "" for the stages of a whole course.
+        """
+        with self.lock:
+            self.records.append((course_name, version, file_name, stage, duration_secs, byte_count, row_count))
+        self.sink.stage_duration(self.run_id, course_name, version, file_name, stage, started_datetime, duration_secs,
+                                 byte_count, row_count)
+
+    @contextmanager
+    def timed(self, course_name, version, file_name, stage):
+        """
+            Record how long the block of a with statement takes, as a stage of a course file.
+        """
+        started_datetime = str(datetime.now())
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            self.record(course_name, version, file_name, stage, started_datetime, time.time() - start_time)
+
+    def summary(self, **extra):
+        """
+            Add up the records by stage and by course.
+        :param extra: More entries for the summary (e.g. the connection pool statistics).
+        :return: A dictionary that can be written as JSON.
+        """
+        stages = {}
+        courses = {}
+        with self.lock:
+            records = list(self.records)
+        for course_name, version, file_name, stage, duration_secs, byte_count, row_count in records:
+            total = stages.setdefault(stage, {'count': 0, 'seconds': 0.0, 'bytes': 0, 'rows': 0})
+            total['count'] += 1
+            total['seconds'] += duration_secs
+            total['bytes'] += byte_count or 0
+            total['rows'] += row_count or 0
+            if course_name is not None:
+                course = courses.setdefault("{0}-{1}".format(course_name, version), {'seconds': 0.0, 'bytes': 0, 'rows': 0, 'files': {}})
+                course['seconds'] += duration_secs
+                course['bytes'] += byte_count or 0
+                course['rows'] += row_count or 0
+                if file_name:
+                    file_stages = course['files'].setdefault(file_name, {})
+                    file_stages[stage] = file_stages.get(stage, 0.0) + duration_secs
+
+        summary = {'run_id': self.run_id, 'started': self.started_datetime, 'finished': str(datetime.now()),
+                   'seconds': time.time() - self.start_time, 'stages': stages, 'courses': courses}
+        summary.update(extra)
+        return summary
+
+    def write_summary(self, folder, **extra):
+        """
+            Write the summary of the run to run-<started>-<run_id>.json in a folder.
+        :return: The path of the file.
+        """
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        path = os.path.join(folder, "run-{0}-{1}.json".format(datetime.now().strftime('%Y%m%d-%H%M%S'), self.run_id))
+        with open(path, 'w') as f:
+            json.dump(self.summary(**extra), f, indent=2, sort_keys=True)
+        return path
@@ -0,0 +1,106 @@
+# ************************************************************************************************
+# *****************       FutureLearn Analytics dashboard. (Educators' view)    *********************************
+#
+# The project is developed to provide re-usable analytics building blocks supporting the sense-making process of
+# learners' and educators' activity in FutureLearn MOOCs.
+# The original data sources are provided by FutureLearn to partners as files in CSV format. The code shared in this
+# repository is based on a specific database conversion, and the overall architecture are documented in the README file.
+#
+# The scripts are provided 'as is' WITHOUT ANY WARRANTY. The key is to encourage others in the community
+# to share knowledge, expertise and experiences, contributing to the project and benefit each other in the process.
+#
+# For this reason, the code is released under GNU Affero General Public License, version 3.
+# For a quick summary see: https://tldrlegal.com/license/gnu-affero-general-public-license-v3-(agpl-3.0)
+# Full details of the license see: https://www.gnu.org/licenses/agpl.html
+#
+# The original code was written by Dr. Mahsa Chitsaz, Educational Data Scientist and Dr. Andrew Clayphan, Educational Data Scientist
+# in the Portfolio of the Pro-Vice Chancellor Education PVC(E) at UNSW Sydney, Australia.
+#
+# For further information, requests to access the repo as developer, comments and feedback,
+# please contact education.data@unsw.edu.au
+#
+# ************************************************************************************************
+
+# ---------------------------------------------------------------------------------
+#
+# The column types of every FutureLearn export, as stored in the file_information, column_information
+# and file_column_information tables of futurelearn_courses_information.
+# They are read once, and only read again by refresh() when the checksum of these tables changes. main.py builds
+# the registry once per run, in ConfigParameters, rather than checking it for every export.
+#
+# ---------------------------------------------------------------------------------
+from collections import namedtuple
+from db_stream import stream_procedure
+
+# column_types: column name -> MySQL type, types: column name -> pandas type (for read_csv),
+# datetime_columns: the columns converted with pandas.to_datetime before loading.
+FileSchema = namedtuple('FileSchema', ['column_types', 'types', 'datetime_columns'])
+
+SCHEMA_TABLES = ['file_information', 'column_information', 'file_column_information']
+
+
+def build_file_schemas(file_column_names):
+    """
+        Group the result of get_file_column_names by file.
+        We have to specify the data type of the column, otherwise 'step' column would be considered as floating point.
+    :param file_column_names: The (filename, column_name, column_type) tuples from get_file_column_names.
+    :return: A dictionary of file name to FileSchema.
+    """
+    schemas = {}
+    for file_name, column_name, column_type in file_column_names:
+        if file_name not in schemas:
+            schemas[file_name] = FileSchema({}, {}, [])
+        schema = schemas[file_name]
+        schema.column_types[column_name] = column_type
+        if 'varchar' in column_type:
+            schema.types[column_name] = str
+        elif 'tinyint' in column_type:
+            schema.types[column_name] = bool
+        else:
+            schema.types[column_name] = object
+        if column_type == 'datetime':
+            schema.datetime_columns.append(column_name)
+    return schemas
+
+
+class SchemaRegistry:
+    def __init__(self, db, fetch_size=1000):
+        """Keep the schema of every export file in memory.
+
+            :param:
+                db: A connection to the futurelearn_courses_information database
+                fetch_size: The number of rows of get_file_column_names read from the server at a time
+        """
+        self.db = db
+        self.fetch_size = fetch_size
+        self.checksum = None
+        self.schemas = {}
+        self.refresh()
+
+    def get_checksum(self):
+        cursor = self.db.cursor()
+        cursor.execute("CHECKSUM TABLE {0};".format(", ".join(SCHEMA_TABLES)))
+        checksum = tuple(row[1] for row in cursor.fetchall())
+        cursor.close()
+        return checksum
+
+    def refresh(self):
+        """
+            Read the schemas again if the tables they come from have changed since they were last read.
+        :return: True if the schemas were read again.
+        """
+        checksum = self.get_checksum()
+        if checksum == self.checksum:
+            return False
+
+        self.schemas = build_file_schemas(stream_procedure(self.db, 'get_file_column_names', fetch_size=self.fetch_size))
+        self.checksum = checksum
+        return True
+
+    def get(self, file_name):
+        """
+            Find the schema of an export file.
+        :param file_name: The name of the file (e.g. step_activity).
+        :return: The FileSchema of the file, with no columns if the file is unknown.
+        """
+        return self.schemas.get(file_name, FileSchema({}, {}, []))